@@ -1,13 +1,46 @@
+import logging
+import os
+import sys
+import uuid
 import streamlit as st
 from datetime import datetime
-from openai import OpenAI
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Shared helpers live in the repo-level coxai package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from coxai.answers import answer_locally
+from coxai.cache import ResponseCache
+from coxai.context import ContextWindow, llm_summarizer
+from coxai.llm import get_client
+from coxai.cpm import CriticalPathSolver
+from coxai.crash import evaluate_crash_options, evaluation_table
+from coxai.montecarlo import simulate
+from coxai.prompts import layout_system_prompt
+from coxai.resilience import ResilientCaller
+from coxai.router import ModelRouter, last_user_message
+from coxai.tracing import trace
+from coxai.project import (BASELINE_COST_K, CONTINGENCY, DEADLINE, DEADLINE_DAYS, DELAY_PENALTY_PER_DAY,
+                           DELTA_WIND_FARM, GATE_DAYS, REWORK_DAYS, REWORK_PROB, case_study_brief)
+
+# Opened as a page of the SMU Cox AI Portal (whose entry script is another file) rather than on its own;
+# the portal's navigation is in the sidebar, so keep it and the header toolbar that expands it
+ctx = get_script_run_ctx()
+IN_PORTAL = ctx is not None and os.path.abspath(ctx.pages_manager.main_script_path) != os.path.abspath(__file__)
 
 # Page config - MUST be first
-st.set_page_config(page_title="Delta Wind Farm Project", page_icon="🎯", layout="wide", initial_sidebar_state="collapsed")
+st.set_page_config(page_title="Delta Wind Farm Project", page_icon="🎯", layout="wide",
+                   initial_sidebar_state="auto" if IN_PORTAL else "collapsed")
+
+# Fallbacks and dropped streams are logged, not shown; the student sees FALLBACK_REPLY
+logger = logging.getLogger("department_bot")
 
 # OpenAI
 OPENAI_KEY = ""
-client = OpenAI(api_key=OPENAI_KEY)
+client = get_client(OPENAI_KEY)  # shared, pooled client reused across reruns
+STREAM_RESPONSES = True  # render replies token-by-token instead of behind a spinner
+HISTORY_KEEP_TURNS = 6  # most recent turns sent verbatim; older ones are summarized
+MAX_INPUT_TOKENS = 4000  # ceiling for system prompt + summary + recent turns
+FALLBACK_REPLY = "Sorry Sarah, something just came up on my end and I need a minute. Could you ask me that again shortly?"
 
 # Session state
 if 'active_agent' not in st.session_state:
@@ -16,6 +49,10 @@ if 'chat_history' not in st.session_state:
     st.session_state.chat_history = {}
 if 'phase' not in st.session_state:
     st.session_state.phase = 'investigation'
+if 'rendered' not in st.session_state:
+    st.session_state.rendered = {}  # message id -> bubble HTML
+if 'transcript_html' not in st.session_state:
+    st.session_state.transcript_html = {}  # agent id -> (message count, joined bubbles)
 
 # Data
 STAKEHOLDERS = {
@@ -36,154 +73,293 @@ GREETINGS = {
     "ava": "Sarah, I have about 10 minutes before my next meeting. Tell me you have a coherent plan that doesn't miss June 30."
 }
 
-CASE_STUDY = """DELTA WIND FARM - PHASE II: 50 turbines, June 30 HARD deadline (investor covenant)
-Budget: $4.09M + $400k contingency | Delay: $3k/day | NO early savings
-
-ACTIVITIES (O/M/P days): A1 Access:6/8/12(Sam) | A2 Platform:7/9/14(Maya) | A3 Foundation:10/12/16(Sam,BOTTLENECK) | A4 Install:8/11/17(Maya) | A5 Ship:6/8/10(Rita) | A6 Tower:8/10/15(Maya) | A7 Nacelle:7/9/12(Maya) | A8 Cable:10/13/18(Maya) | A9 Substation:8/10/13(Sam) | A10 Integration:6/8/11 | A11 Inspection:5/6/9(Carlos) | A12 Handover:2/3/5
-
-DEPS: A1→A3, A2→A4, A3&A2→A4, A4&A5→A6, A6→A7&A8, A8&A9→A10→A11→A12
-RISKS: A6↔A8 coupling (30% rework +4d) | Regulatory gate (+5d halt if not cleared before A6/A8)
-CRASH (ONE only): S1:A3-3d$70k | S2:A5-4d$110k | S3:A6-5d$150k | S4:A8-4d$130k | S5:A9-3d$60k"""
+# Case text and role prompts are rendered once from the shared project model
+NET = DELTA_WIND_FARM
+CASE_STUDY = case_study_brief(NET)
 
 ROLE_PROMPTS = {
-    "sam": "You are Sam Patel, Construction Manager. Handle A1(6/8/12d), A3(10/12/16d-BOTTLENECK), A9(8/10/13d). Offer S1: 2nd batch for A3(-3d,$70k). Deps: A1→A3→A4.",
-    "rita": "You are Rita Gomez, Procurement. Handle A5(6/8/10d). Offer S2: faster cargo(-4d,$110k). A5 gates A6.",
-    "maya": "You are Maya Li, Offshore Eng. Handle A2,A4,A6,A7,A8. CRITICAL: A6↔A8 30% rework(+4d). Offer S3: 2nd crane A6(-5d,$150k) or S4: ROV A8(-4d,$130k).",
-    "leo": "You are Leo Armstrong, Finance. Budget $4.09M+$400k. Delay $3k/day. NO early savings. Rule: ONE crash only.",
-    "carlos": "You are Carlos Ruiz, Compliance. Handle A11(5/6/9d). CRITICAL: paperwork before A6/A8 or +5d halt. Clear parallel with A1/A2.",
-    "ava": "You are Ava Johnson, CEO. June 30 NON-NEGOTIABLE. Want: network, PERT date, ONE crash, risk plan, memo."
+    "sam": f"You are Sam Patel, Construction Manager. Handle {NET.brief('A1')}, {NET.brief('A3', 'BOTTLENECK')}, {NET.brief('A9')}. Offer S1: 2nd batch for {NET.crash_brief('S1')}. Deps: A1→A3→A4.",
+    "rita": f"You are Rita Gomez, Procurement. Handle {NET.brief('A5')}. Offer S2: faster cargo for {NET.crash_brief('S2')}. A5 gates A6.",
+    "maya": f"You are Maya Li, Offshore Eng. Handle A2,A4,A6,A7,A8. CRITICAL: A6↔A8 {REWORK_PROB:.0%} rework(+{REWORK_DAYS:g}d). Offer S3: 2nd crane {NET.crash_brief('S3')} or S4: ROV {NET.crash_brief('S4')}.",
+    "leo": f"You are Leo Armstrong, Finance. Budget ${BASELINE_COST_K / 1000:.2f}M+${CONTINGENCY // 1000}k. Delay ${DELAY_PENALTY_PER_DAY // 1000}k/day. NO early savings. Rule: ONE crash only.",
+    "carlos": f"You are Carlos Ruiz, Compliance. Handle {NET.brief('A11')}. CRITICAL: paperwork before A6/A8 or +{GATE_DAYS:g}d halt. Clear parallel with A1/A2.",
+    "ava": f"You are Ava Johnson, CEO. {DEADLINE} NON-NEGOTIABLE. Want: network, PERT date, ONE crash, risk plan, memo."
 }
 
+# Shared case text leads every system prompt, identical across roles, so it forms one cacheable prefix
+SHARED_PROMPT = f"{CASE_STUDY}\n\nContext: Student (Sarah Chen, PM) interviewing you. Be helpful, specific numbers, 2-3 paragraphs."
+SYSTEM_PROMPTS = {key: layout_system_prompt(SHARED_PROMPT, prompt) for key, prompt in ROLE_PROMPTS.items()}
+PROMPT_CACHE_KEY = "delta-wind-farm-brief"
+ROUTER = ModelRouter()  # gpt-4o-mini for simple turns, gpt-4o for critical-path/crash analysis
+
 OBJECTIVES = {
     'investigation': ['🔍 Interview all 6 stakeholders', '🔗 Identify dependencies (A1-A12)', '💰 Understand budget/timeline constraints', '📊 Collect three-point estimates', '⚠️ Discover A6↔A8 coupling risk', '📋 Learn regulatory paperwork gate'],
     'analysis': ['📈 Build network diagram', '🧮 Calculate PERT durations', '🎯 Identify critical path', '🔄 Model A6↔A8 rework loop', '📅 Calculate baseline completion', '⚡ Evaluate crash options'],
     'recommendation': ['✅ Select ONE crash option', '📆 Calculate revised completion', '💵 Estimate total cost exposure', '🛡️ Develop risk mitigation plan', '📄 Draft executive memo', '🎤 Defend your decision']
 }
 
+@st.cache_resource
+def get_context_window():
+    # Cached across reruns and sessions so running summaries survive between turns
+    return ContextWindow(llm_summarizer(client), keep_turns=HISTORY_KEEP_TURNS, max_input_tokens=MAX_INPUT_TOKENS)
+
+@st.cache_resource
+def get_llm_caller():
+    # One retry policy and circuit breaker per process, shared by every session
+    return ResilientCaller()
+
+@st.cache_resource
+def get_reply_cache():
+    # Answers to repeated questions, served when the API is unavailable
+    return ResponseCache(max_entries=512, ttl_seconds=24 * 3600)
+
+def fallback_reply(role_key, user_msg, error):
+    logger.warning("%s: falling back after %s: %s", role_key, type(error).__name__, error)
+    cache = get_reply_cache()
+    return cache.get(cache.key("reply", role_key=role_key, question=user_msg)) or FALLBACK_REPLY
+
+def remember_reply(role_key, user_msg, reply):
+    cache = get_reply_cache()
+    cache.set(cache.key("reply", role_key=role_key, question=user_msg), reply)
+
+def build_messages(role_key, user_msg, history):
+    system = SYSTEM_PROMPTS[role_key]
+    turns = [{"role": "user" if m['role']=='user' else "assistant", "content": m['text']} for m in history]
+    return get_context_window().build(system, turns, user_msg, key=role_key)
+
 def get_ai_response(role_key, user_msg, history):
+    answer = answer_locally(user_msg, "department_bot", role_key)  # PERT/cost/crash lookups from case data
+    if answer is not None:
+        return answer
+    route = ROUTER.route(user_msg, last_user_message(history, text_key='text'))
     try:
-        msgs = [{"role": "system", "content": f"{ROLE_PROMPTS[role_key]}\n\nContext: Student (Sarah Chen, PM) interviewing you. Be helpful, specific numbers, 2-3 paragraphs.\n\n{CASE_STUDY}"}]
-        for m in history:
-            msgs.append({"role": "user" if m['role']=='user' else "assistant", "content": m['text']})
-        msgs.append({"role": "user", "content": user_msg})
-        resp = client.chat.completions.create(model="gpt-4o-mini", messages=msgs, max_tokens=500, temperature=0.7)
+        with trace("department_bot", route.model, stakeholder=role_key, route=route.name) as span:
+            resp = get_llm_caller().call(client.chat.completions.create, model=route.model, messages=build_messages(role_key, user_msg, history), max_tokens=500, temperature=0.7, prompt_cache_key=PROMPT_CACHE_KEY)
+            span.record_usage(resp.usage)
+        remember_reply(role_key, user_msg, resp.choices[0].message.content)
         return resp.choices[0].message.content
     except Exception as e:
-        return f"Error: {e}"
+        return fallback_reply(role_key, user_msg, e)
+
+def stream_ai_response(role_key, user_msg, history):
+    answer = answer_locally(user_msg, "department_bot", role_key)
+    if answer is not None:
+        yield answer
+        return
+    reply = ""
+    route = ROUTER.route(user_msg, last_user_message(history, text_key='text'))
+    try:
+        with trace("department_bot", route.model, stakeholder=role_key, stream=True, route=route.name) as span:
+            stream = get_llm_caller().call(client.chat.completions.create, model=route.model, messages=build_messages(role_key, user_msg, history), max_tokens=500, temperature=0.7, prompt_cache_key=PROMPT_CACHE_KEY, stream=True, stream_options={"include_usage": True})
+            for chunk in stream:
+                if chunk.usage:
+                    span.record_usage(chunk.usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    span.first_token()
+                    reply += chunk.choices[0].delta.content
+                    yield chunk.choices[0].delta.content
+        remember_reply(role_key, user_msg, reply)
+    except Exception as e:
+        # Before the first token fall back; mid-reply keep what arrived and say it was cut off
+        if reply:
+            logger.warning("%s: stream interrupted: %s", role_key, e)
+            yield "\n\n*(The connection dropped - please ask again for the rest.)*"
+        else:
+            yield fallback_reply(role_key, user_msg, e)
+
+def new_message(role, text):
+    return {'id': uuid.uuid4().hex, 'role': role, 'text': text, 'time': datetime.now().strftime('%H:%M:%S')}
+
+def user_bubble(msg):
+    return f"""<div style="display:flex;justify-content:flex-end;margin-bottom:16px;">
+                        <div style="max-width:75%;padding:12px 16px;border-radius:12px;background:#354CA1;color:white;">
+                            <div style="font-size:11px;opacity:0.7;margin-bottom:4px;">You • {msg['time']}</div>
+                            <div style="font-size:14px;line-height:1.5;">{msg['text']}</div>
+                        </div>
+                    </div>"""
+
+def agent_bubble(name, msg):
+    # Replies (and case-data lookups) are Markdown; the blank lines around the text end the
+    # HTML blocks so it gets parsed, and the closing tags must not be indented or they'd be code
+    return f"""<div style="display:flex;justify-content:flex-start;margin-bottom:16px;">
+<div style="max-width:75%;padding:12px 16px;border-radius:12px;background:#f3f4f6;color:#1f2937;">
+<div style="font-size:11px;opacity:0.7;margin-bottom:4px;">{name} • {msg['time']}</div>
+<div class="agent-text" style="font-size:14px;line-height:1.5;">
+
+{msg['text']}
+
+</div>
+</div>
+</div>"""
+
+def rendered_bubble(name, msg):
+    # Messages never change once appended, so each bubble is built once per session
+    html = st.session_state.rendered.get(msg['id'])
+    if html is None:
+        html = user_bubble(msg) if msg['role'] == 'user' else agent_bubble(name, msg)
+        st.session_state.rendered[msg['id']] = html
+    return html
+
+def transcript_html(aid, name):
+    # Extend the joined chat block with only the messages added since the last rerun
+    messages = st.session_state.chat_history.get(aid, [])
+    count, html = st.session_state.transcript_html.get(aid, (0, ""))
+    if count != len(messages):
+        html += "".join(f"\n\n{rendered_bubble(name, m)}" for m in messages[count:])
+        st.session_state.transcript_html[aid] = (len(messages), html)
+    return html
+
+def export_transcript(chat_history):
+    text = "DELTA WIND FARM - Interview Transcript\n" + "="*50 + "\n\n"
+    for aid, msgs in chat_history.items():
+        if msgs:
+            text += f"{STAKEHOLDERS[aid]['emoji']} {STAKEHOLDERS[aid]['name']}\n" + "-"*50 + "\n"
+            for m in msgs:
+                speaker = "You" if m['role']=='user' else STAKEHOLDERS[aid]['name']
+                text += f"[{m['time']}] {speaker}: {m['text']}\n\n"
+            text += "\n"
+    return text
+
+@st.cache_resource
+def baseline_cpm():
+    # Shared read-only baseline; what-ifs work on a copy and recompute incrementally
+    return CriticalPathSolver(NET)
+
+@st.cache_data
+def schedule_simulation(deadline_days, n_trials=1_000_000):
+    return simulate(n_trials, seed=42, deadline_days=deadline_days).summary()
+
+@st.cache_data
+def crash_evaluation(deadline_days):
+    return evaluate_crash_options(seed=42, deadline_days=deadline_days)
+
+def select_agent(aid):
+    # Button callbacks run before the fragment reruns, so no extra st.rerun() is needed
+    st.session_state.active_agent = aid
+    if aid not in st.session_state.chat_history:
+        st.session_state.chat_history[aid] = [new_message('agent', GREETINGS[aid])]
+
+def set_phase(phase):
+    st.session_state.phase = phase
 
 def interviewed_count():
     return sum(1 for msgs in st.session_state.chat_history.values() if any(m['role']=='user' for m in msgs))
 
 # CSS
+if not IN_PORTAL:
+    st.markdown("""<style>
+header,div[data-testid="stToolbar"],section[data-testid="stSidebar"]{display:none!important;}
+</style>""", unsafe_allow_html=True)
 st.markdown("""<style>
-#MainMenu,footer,header,.stDeployButton,div[data-testid="stToolbar"],div[data-testid="stDecoration"],div[data-testid="stStatusWidget"]{display:none!important;}
-section[data-testid="stSidebar"]{display:none!important;}
+#MainMenu,footer,.stDeployButton,div[data-testid="stDecoration"],div[data-testid="stStatusWidget"]{display:none!important;}
 .main .block-container{padding:0!important;max-width:100%!important;}
 .stApp{background:#f5f5f5;}
 div[data-testid="stVerticalBlock"]{gap:0!important;}
 div[data-testid="stHorizontalBlock"]{gap:0!important;}
 div[data-testid="column"]{padding:0!important;}
+.agent-text p,.agent-text ul{font-size:14px;margin-bottom:0.5em;}.agent-text>:last-child{margin-bottom:0;}
 </style>""", unsafe_allow_html=True)
 
 # Layout
-left_col, center_col, right_col = st.columns([1, 2.5, 1.2])
-
-# LEFT PANEL
-with left_col:
-    st.markdown("""<div style="background:#354CA1;color:white;padding:16px;font-weight:bold;font-size:14px;">👥 Stakeholders</div>""", unsafe_allow_html=True)
-    st.markdown("""<div style="padding:12px 16px;background:#F9F9F9;border-bottom:1px solid #e5e7eb;">
-        <div style="color:#354CA1;font-weight:bold;font-size:14px;">You are Sarah Chen</div>
-        <div style="color:#6b7280;font-size:12px;">Project Manager</div>
-        <div style="color:#9ca3af;font-size:11px;margin-top:4px;">Click stakeholders to interview</div>
-    </div>""", unsafe_allow_html=True)
+interview_col, right_col = st.columns([3.5, 1.2])
+
+@st.fragment(key="chat")
+def interview_panel():
+    # Stakeholder list + chat rerun on their own; the objectives column is left alone
+    left_col, center_col = st.columns([1, 2.5])
+
+    # LEFT PANEL
+    with left_col:
+        st.markdown("""<div style="background:#354CA1;color:white;padding:16px;font-weight:bold;font-size:14px;">👥 Stakeholders</div>""", unsafe_allow_html=True)
+        st.markdown("""<div style="padding:12px 16px;background:#F9F9F9;border-bottom:1px solid #e5e7eb;">
+            <div style="color:#354CA1;font-weight:bold;font-size:14px;">You are Sarah Chen</div>
+            <div style="color:#6b7280;font-size:12px;">Project Manager</div>
+            <div style="color:#9ca3af;font-size:11px;margin-top:4px;">Click stakeholders to interview</div>
+        </div>""", unsafe_allow_html=True)
     
-    for aid, agent in STAKEHOLDERS.items():
-        is_active = st.session_state.active_agent == aid
-        msg_cnt = len([m for m in st.session_state.chat_history.get(aid, []) if m['role']=='user'])
+        for aid, agent in STAKEHOLDERS.items():
+            is_active = st.session_state.active_agent == aid
+            msg_cnt = len([m for m in st.session_state.chat_history.get(aid, []) if m['role']=='user'])
         
-        bg = '#E8F4F8' if is_active else '#f9fafb'
-        border = '2px solid #59C3C3' if is_active else '1px solid #e5e7eb'
-        badge = f' ({msg_cnt})' if msg_cnt > 0 else ''
+            bg = '#E8F4F8' if is_active else '#f9fafb'
+            border = '2px solid #59C3C3' if is_active else '1px solid #e5e7eb'
+            badge = f' ({msg_cnt})' if msg_cnt > 0 else ''
         
-        if st.button(f"{agent['emoji']} {agent['name']}{badge}", key=f"agent_{aid}", use_container_width=True):
-            st.session_state.active_agent = aid
-            if aid not in st.session_state.chat_history:
-                st.session_state.chat_history[aid] = [{'role':'agent','text':GREETINGS[aid],'time':datetime.now().strftime('%H:%M:%S')}]
-            st.rerun()
-        st.caption(agent['title'])
-
-# CENTER PANEL
-with center_col:
-    # Header
-    if st.session_state.active_agent:
-        agent = STAKEHOLDERS[st.session_state.active_agent]
-        st.markdown(f"""<div style="background:linear-gradient(to right,#354CA1,#CC0035);color:white;padding:16px;">
-            <div style="font-weight:bold;font-size:16px;">💬 Interview: {agent['name']}</div>
-            <div style="font-size:13px;opacity:0.9;margin-top:4px;">{agent['title']}</div>
-        </div>""", unsafe_allow_html=True)
-    else:
-        st.markdown("""<div style="background:linear-gradient(to right,#354CA1,#CC0035);color:white;padding:16px;">
-            <div style="font-weight:bold;font-size:16px;">💬 Select a stakeholder to begin</div>
-        </div>""", unsafe_allow_html=True)
+            st.button(f"{agent['emoji']} {agent['name']}{badge}", key=f"agent_{aid}", use_container_width=True, on_click=select_agent, args=(aid,))
+            st.caption(agent['title'])
+
+    # CENTER PANEL
+    with center_col:
+        # Header
+        if st.session_state.active_agent:
+            agent = STAKEHOLDERS[st.session_state.active_agent]
+            st.markdown(f"""<div style="background:linear-gradient(to right,#354CA1,#CC0035);color:white;padding:16px;">
+                <div style="font-weight:bold;font-size:16px;">💬 Interview: {agent['name']}</div>
+                <div style="font-size:13px;opacity:0.9;margin-top:4px;">{agent['title']}</div>
+            </div>""", unsafe_allow_html=True)
+        else:
+            st.markdown("""<div style="background:linear-gradient(to right,#354CA1,#CC0035);color:white;padding:16px;">
+                <div style="font-weight:bold;font-size:16px;">💬 Select a stakeholder to begin</div>
+            </div>""", unsafe_allow_html=True)
     
-    # Content
-    if not st.session_state.active_agent:
-        st.markdown("""<div style="text-align:center;padding:60px 20px;">
-            <div style="font-size:64px;margin-bottom:16px;">🎯</div>
-            <h2 style="color:#354CA1;font-size:28px;font-weight:bold;margin-bottom:12px;">Delta Wind Farm Project</h2>
-            <p style="color:#4b5563;margin-bottom:8px;">You are <strong>Sarah Chen</strong>, Project Manager for Delta Renewables</p>
-            <div style="background:#F9F9F9;border-left:4px solid #59C3C3;padding:16px;max-width:600px;margin:16px auto;text-align:left;border-radius:4px;">
-                <p style="margin-bottom:12px;"><strong>Situation:</strong> Phase II expansion (50 turbines) has run into turbulence. June 30 deadline is fixed by investor covenant. Missing it means financing freeze.</p>
-                <p><strong>Your Mission:</strong> Interview stakeholders, gather information, identify the critical path, choose ONE acceleration option, and deliver a risk-aware plan that hits the deadline.</p>
-            </div>
-            <p style="color:#CC0035;font-weight:600;font-size:18px;margin-top:24px;">👈 Select a stakeholder to start your investigation</p>
-        </div>""", unsafe_allow_html=True)
-    else:
-        # Chat messages
-        agent = STAKEHOLDERS[st.session_state.active_agent]
-        messages = st.session_state.chat_history.get(st.session_state.active_agent, [])
+        # Content
+        if not st.session_state.active_agent:
+            st.markdown("""<div style="text-align:center;padding:60px 20px;">
+                <div style="font-size:64px;margin-bottom:16px;">🎯</div>
+                <h2 style="color:#354CA1;font-size:28px;font-weight:bold;margin-bottom:12px;">Delta Wind Farm Project</h2>
+                <p style="color:#4b5563;margin-bottom:8px;">You are <strong>Sarah Chen</strong>, Project Manager for Delta Renewables</p>
+                <div style="background:#F9F9F9;border-left:4px solid #59C3C3;padding:16px;max-width:600px;margin:16px auto;text-align:left;border-radius:4px;">
+                    <p style="margin-bottom:12px;"><strong>Situation:</strong> Phase II expansion (50 turbines) has run into turbulence. June 30 deadline is fixed by investor covenant. Missing it means financing freeze.</p>
+                    <p><strong>Your Mission:</strong> Interview stakeholders, gather information, identify the critical path, choose ONE acceleration option, and deliver a risk-aware plan that hits the deadline.</p>
+                </div>
+                <p style="color:#CC0035;font-weight:600;font-size:18px;margin-top:24px;">👈 Select a stakeholder to start your investigation</p>
+            </div>""", unsafe_allow_html=True)
+        else:
+            # Chat messages
+            agent = STAKEHOLDERS[st.session_state.active_agent]
         
-        chat_container = st.container(height=750)
-        with chat_container:
-            for msg in messages:
-                if msg['role'] == 'user':
-                    st.markdown(f"""<div style="display:flex;justify-content:flex-end;margin-bottom:16px;">
-                        <div style="max-width:75%;padding:12px 16px;border-radius:12px;background:#354CA1;color:white;">
-                            <div style="font-size:11px;opacity:0.7;margin-bottom:4px;">You • {msg['time']}</div>
-                            <div style="font-size:14px;line-height:1.5;">{msg['text']}</div>
-                        </div>
-                    </div>""", unsafe_allow_html=True)
-                else:
-                    st.markdown(f"""<div style="display:flex;justify-content:flex-start;margin-bottom:16px;">
-                        <div style="max-width:75%;padding:12px 16px;border-radius:12px;background:#f3f4f6;color:#1f2937;">
-                            <div style="font-size:11px;opacity:0.7;margin-bottom:4px;">{agent['name']} • {msg['time']}</div>
-                            <div style="font-size:14px;line-height:1.5;">{msg['text']}</div>
-                        </div>
-                    </div>""", unsafe_allow_html=True)
+            chat_container = st.container(height=750)
+            with chat_container:
+                st.markdown(transcript_html(st.session_state.active_agent, agent['name']), unsafe_allow_html=True)
         
-        # Input
-        st.markdown("""<div style="padding:8px 0;border-top:1px solid #e5e7eb;background:#f9fafb;">""", unsafe_allow_html=True)
+            # Input
+            st.markdown("""<div style="padding:8px 0;border-top:1px solid #e5e7eb;background:#f9fafb;">""", unsafe_allow_html=True)
         
-        input_col, btn_col = st.columns([5, 1])
-        with input_col:
-            user_input = st.text_input("Message", placeholder=f"Ask {agent['name']} about activities, dependencies, risks...", label_visibility="collapsed", key="chat_input")
-        with btn_col:
-            send_clicked = st.button("Send", key="send_btn", use_container_width=True)
+            input_col, btn_col = st.columns([5, 1])
+            with input_col:
+                user_input = st.text_input("Message", placeholder=f"Ask {agent['name']} about activities, dependencies, risks...", label_visibility="collapsed", key="chat_input")
+            with btn_col:
+                send_clicked = st.button("Send", key="send_btn", use_container_width=True)
         
-        if send_clicked and user_input.strip():
-            st.session_state.chat_history[st.session_state.active_agent].append({'role':'user','text':user_input.strip(),'time':datetime.now().strftime('%H:%M:%S')})
-            with st.spinner(f"{agent['name']} is typing..."):
-                response = get_ai_response(st.session_state.active_agent, user_input, st.session_state.chat_history[st.session_state.active_agent][:-1])
-            st.session_state.chat_history[st.session_state.active_agent].append({'role':'agent','text':response,'time':datetime.now().strftime('%H:%M:%S')})
-            st.rerun()
+            if send_clicked and user_input.strip():
+                first_question = not any(m['role']=='user' for m in st.session_state.chat_history[st.session_state.active_agent])
+                st.session_state.chat_history[st.session_state.active_agent].append(new_message('user', user_input.strip()))
+                if STREAM_RESPONSES:
+                    # Render deltas in place; only the finished reply is committed to history
+                    with chat_container:
+                        st.markdown(rendered_bubble(agent['name'], st.session_state.chat_history[st.session_state.active_agent][-1]), unsafe_allow_html=True)
+                        placeholder = st.empty()
+                        reply_time = datetime.now().strftime('%H:%M:%S')
+                        response = ""
+                        for delta in stream_ai_response(st.session_state.active_agent, user_input, st.session_state.chat_history[st.session_state.active_agent][:-1]):
+                            response += delta
+                            placeholder.markdown(agent_bubble(agent['name'], {'time': reply_time, 'text': response + " ▌"}), unsafe_allow_html=True)
+                else:
+                    with st.spinner(f"{agent['name']} is typing..."):
+                        response = get_ai_response(st.session_state.active_agent, user_input, st.session_state.chat_history[st.session_state.active_agent][:-1])
+                st.session_state.chat_history[st.session_state.active_agent].append(new_message('agent', response))
+                # Only a first question changes the progress panel outside this fragment; scope="fragment"
+                # is only valid during a fragment rerun (a full run happens e.g. under AppTest)
+                fragment_run = bool(get_script_run_ctx().fragment_ids_this_run)
+                st.rerun(scope="fragment" if fragment_run and not first_question else "app")
         
-        st.markdown("""<div style="text-align:center;font-size:12px;color:#6b7280;margin-top:8px;">💡 <strong>Try asking:</strong> "Can you elaborate?" • "Why is that?" • "What do you recommend?"</div>""", unsafe_allow_html=True)
-        st.markdown("</div>", unsafe_allow_html=True)
+            st.markdown("""<div style="text-align:center;font-size:12px;color:#6b7280;margin-top:8px;">💡 <strong>Try asking:</strong> "Can you elaborate?" • "Why is that?" • "What do you recommend?"</div>""", unsafe_allow_html=True)
+            st.markdown("</div>", unsafe_allow_html=True)
+
+@st.fragment(key="objectives")
+def objectives_panel():
+    # Switching phase reruns only the phase buttons and objective list
 
-# RIGHT PANEL
-with right_col:
-    st.markdown("""<div style="background:#F9C80E;color:#262626;padding:16px;font-weight:bold;font-size:14px;">🎯 Mission Objectives</div>""", unsafe_allow_html=True)
-    
     # Phase selector
     st.markdown("""<div style="padding:12px;border-bottom:1px solid #e5e7eb;background:#f9fafb;">
         <div style="font-size:12px;color:#6b7280;margin-bottom:8px;">Current Phase:</div>
@@ -191,9 +367,7 @@ with right_col:
     
     for p in ['investigation', 'analysis', 'recommendation']:
         is_active = st.session_state.phase == p
-        if st.button(p.capitalize(), key=f"phase_{p}", use_container_width=True, type="primary" if is_active else "secondary"):
-            st.session_state.phase = p
-            st.rerun()
+        st.button(p.capitalize(), key=f"phase_{p}", use_container_width=True, type="primary" if is_active else "secondary", on_click=set_phase, args=(p,))
     
     # Objectives
     st.markdown("<div style='padding:16px;'>", unsafe_allow_html=True)
@@ -202,6 +376,15 @@ with right_col:
             <span style="color:#59C3C3;">✓</span><span>{obj}</span>
         </div>""", unsafe_allow_html=True)
     st.markdown("</div>", unsafe_allow_html=True)
+
+with interview_col:
+    interview_panel()
+
+# RIGHT PANEL
+with right_col:
+    st.markdown("""<div style="background:#F9C80E;color:#262626;padding:16px;font-weight:bold;font-size:14px;">🎯 Mission Objectives</div>""", unsafe_allow_html=True)
+    
+    objectives_panel()
     
     # Progress
     cnt = interviewed_count()
@@ -228,15 +411,9 @@ with right_col:
     # Export
     st.markdown("<div style='padding:16px;border-top:1px solid #e5e7eb;'>", unsafe_allow_html=True)
     if cnt > 0:
-        export_text = "DELTA WIND FARM - Interview Transcript\n" + "="*50 + "\n\n"
-        for aid, msgs in st.session_state.chat_history.items():
-            if msgs:
-                export_text += f"{STAKEHOLDERS[aid]['emoji']} {STAKEHOLDERS[aid]['name']}\n" + "-"*50 + "\n"
-                for m in msgs:
-                    speaker = "You" if m['role']=='user' else STAKEHOLDERS[aid]['name']
-                    export_text += f"[{m['time']}] {speaker}: {m['text']}\n\n"
-                export_text += "\n"
-        st.download_button("📥 Export All Interviews", export_text, f"delta_wind_interviews.txt", use_container_width=True)
+        # Built on click (on a worker thread, so bind the history dict now) instead of on every rerun
+        history = st.session_state.chat_history
+        st.download_button("📥 Export All Interviews", lambda: export_transcript(history), f"delta_wind_interviews.txt", mime="text/plain", on_click="ignore", use_container_width=True)
     else:
         st.button("📥 Export All Interviews", disabled=True, use_container_width=True)
         st.caption("Interview stakeholders to enable export")
@@ -244,11 +421,35 @@ with right_col:
     
     # Reference
     st.markdown("<div style='padding:16px;border-top:1px solid #e5e7eb;background:#f9fafb;'>", unsafe_allow_html=True)
+    # The case never gives the kickoff date, so the day number of June 30 is an assumption
+    deadline_days = st.number_input(
+        f"Assumed days from kickoff to {DEADLINE}", 1, 365, DEADLINE_DAYS, key="deadline_days",
+        help="Not given in the case. Set the day count you assume; on-time odds and delay cost use it."
+    )
     with st.expander("📐 PERT Formula"):
         st.code("Expected = (O + 4M + P) / 6")
         st.caption("O=Optimistic, M=Most-Likely, P=Pessimistic")
+        what_if = st.selectbox("What-if crash", ["None"] + [c.code for c in NET.crash_options], key="cpm_what_if")
+        cpm = baseline_cpm()
+        if what_if != "None":
+            cpm = cpm.copy()
+            cpm.apply_crash(what_if)
+        st.dataframe(cpm.table(), hide_index=True, use_container_width=True)
+        st.markdown(f"**Critical path:** {' → '.join(cpm.critical_path())}\n\n**Expected finish:** {cpm.finish:.1f} days (assumed deadline: day {deadline_days})")
+        if what_if != "None":
+            st.caption(f"{what_if} recomputed {cpm.last_touched} of {len(NET.codes)} activities; baseline finish {baseline_cpm().finish:.1f} days")
     with st.expander("⚡ Crash Options"):
-        st.markdown("**S1:** A3 Foundation (-3d, $70k)\n\n**S2:** A5 Staging (-4d, $110k)\n\n**S3:** A6 Towers (-5d, $150k)\n\n**S4:** A8 Cabling (-4d, $130k)\n\n**S5:** A9 Substation (-3d, $60k)")
+        st.markdown("\n\n".join(NET.crash_lines()))
+        st.markdown(evaluation_table(crash_evaluation(deadline_days)))
+        st.caption(f"Cost exposure = crash cost + ${DELAY_PENALTY_PER_DAY:,}/day past {DEADLINE}, taken as day {deadline_days} "
+                   f"(an assumption; contingency ${CONTINGENCY:,})")
+    with st.expander("🎲 Schedule Simulation"):
+        sim = schedule_simulation(deadline_days)
+        st.markdown(f"**{sim['trials']:,} Monte Carlo trials** (PERT-beta durations, A6↔A8 rework)\n\n"
+                    f"• Mean finish: **{sim['mean_days']:.1f} days**\n• P10 / P50 / P90: {sim['p10_days']:.1f} / {sim['p50_days']:.1f} / {sim['p90_days']:.1f} days\n"
+                    f"• P(finish ≤ day {deadline_days}, assumed {DEADLINE}): **{sim['p_on_time']:.0%}**")
+        st.caption(f"Assumes regulatory paperwork is cleared in parallel with A1/A2, and that {DEADLINE} is day "
+                   f"{deadline_days} after kickoff (the case gives no kickoff date)")
     with st.expander("🔗 Key Dependencies"):
-        st.markdown("• A1 → A3\n• A2 → A4\n• A3 & A2 → A4\n• A4 & A5 → A6\n• A6 → A7, A8\n• **A6 ↔ A8 (coupling risk!)**\n• A8 & A9 → A10\n• A10 → A11 → A12")
+        st.markdown("\n".join(f"• {line}" for line in NET.dependency_lines()))
     st.markdown("</div>", unsafe_allow_html=True)
@@ -3,94 +3,70 @@ import sys
 
 # Ensure openai is installed
 try:
-    from openai import OpenAI
+    import openai
 except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "openai>=1.0.0"])
-    from openai import OpenAI
 
+import asyncio
 import gradio as gr
+import hashlib
+import json
 import os
+import random
+import threading
+
+# Shared helpers live in the repo-level coxai package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from coxai.answers import answer_locally
+from coxai.cache import ResponseCache
+from coxai.context import ContextWindow, llm_summarizer
+from coxai.crash import evaluate_crash_options, evaluation_table
+from coxai.limiter import FairLimiter, QueueTimeout
+from coxai.llm import get_async_client, get_client
+from coxai.project import DEADLINE, DEADLINE_DAYS, DELAY_PENALTY_PER_DAY, DELTA_WIND_FARM, case_study_context
+from coxai.prompts import format_prefix_report, layout_system_prompt, prefix_report
+from coxai.resilience import ResilientCaller
+from coxai.router import ModelRouter, last_user_message
+from coxai.tracing import trace
 
 # Get and clean the API key
 openai_api_key = os.environ.get("OPENAI_API_KEY", "").strip()
-client = OpenAI(api_key=openai_api_key)
-
-# Case Study Context - This is the knowledge base for all agents
-CASE_STUDY_CONTEXT = """
-# Delta Wind Farm Project - Case Study Context
-
-## Project Overview
-- Phase II expansion: 50 turbines with onshore fabrication and offshore installation
-- Hard deadline: June 30 (tied to Series B investor covenant)
-- Missing deadline triggers financing freeze and reputational damage
-- Project Manager: Sarah Chen
-
-## Activities (12 Total)
-| Code | Activity | Site | Description | Most-Likely (days) | Best | Worst |
-|------|----------|------|-------------|-------------------|------|-------|
-| A1 | Access road and grading | Onshore | Prepare land routes, drainage | 8 | 6 | 12 |
-| A2 | Offshore platform prep | Offshore | Dredging, seabed stabilization | 9 | 7 | 13 |
-| A3 | Foundation fabrication | Onshore | Pour concrete, embed rebar | 12 | 10 | 16 |
-| A4 | Foundation installation | Offshore | Transport and mount foundations | 11 | 9 | 14 |
-| A5 | Turbine shipment and staging | Onshore | Receive/inspect components | 8 | 6 | 10 |
-| A6 | Tower assembly | Offshore | Erect towers using barge cranes | 10 | 8 | 15 |
-| A7 | Nacelle and blade installation | Offshore | Mount nacelles and blades | 9 | 7 | 12 |
-| A8 | Subsea cabling | Offshore | Lay/bury array cables; pull-ins | 13 | 10 | 18 |
-| A9 | Onshore grid substation | Onshore | Build substation, protection | 10 | 8 | 13 |
-| A10 | System integration and testing | Both | Synchronize systems | 8 | 6 | 11 |
-| A11 | Environmental and safety inspection | Both | OSHA/Coast Guard clearance | 6 | 5 | 9 |
-| A12 | Investor report and media release | Onshore | Final report; announcement | 4 | 3 | 6 |
-
-## Dependencies (Network Logic)
-- A1 then A3 (access/yard readiness precedes fabrication)
-- A2 then A4 (offshore platform prep precedes installation)
-- A3 and A2 then A4 (need fabricated bases and prepped seabed)
-- A4 and A5 then A6 (installed foundations + staged components gate tower assembly)
-- A6 then A7 (towers before nacelle/blades)
-- A6 then A8 (start A8 after first towers for as-built data)
-- **Coupling Risk: A6 and A8 are coupled**: 30% chance of rework loop adding +4 days to A8
-- A8 and A9 then A10 (both cables and substation must exist to integrate)
-- A10 then A11 then A12 (test, inspect, then report/launch)
-- Regulatory paperwork gate: must be approved before A6/A8 commence; otherwise +5 days halt
-
-## Baseline Costs
-| Activity | Cost (USD thousands) |
-|----------|----------------|
-| A1 | 120 |
-| A2 | 180 |
-| A3 | 420 |
-| A4 | 560 |
-| A5 | 260 |
-| A6 | 700 |
-| A7 | 520 |
-| A8 | 840 |
-| A9 | 640 |
-| A10 | 300 |
-| A11 | 160 |
-| A12 | 90 |
-| **Total** | **4,090** |
-
-## Financial Constraints
-- Contingency available: $400,000
-- Delay burn: $3,000/day beyond June 30
-- Early completion: No savings (resources pre-contracted)
-- CEO Policy: Only ONE acceleration option allowed
-
-## Crash (Acceleration) Options
-| Option | Activity | Time Saved | Cost | Rationale/Risk |
-|--------|----------|------------|------|----------------|
-| S1 | A3 (foundation) | 3 days | $70k | Add second batch team; coordination risk |
-| S2 | A5 (turbine staging) | 4 days | $110k | Charter faster feeder; unlocks A6 earlier |
-| S3 | A6 (tower assembly) | 5 days | $150k | Second crane crew + barge; QA holds advised |
-| S4 | A8 (subsea cabling) | 4 days | $130k | ROV-assisted lay; weather-sensitive |
-| S5 | A9 (substation) | 3 days | $60k | Overtime electrical crew; manageable |
-
-## Key Risks
-1. A6-A8 coupling: 30% probability of +4 days rework if tower tolerances are off
-2. Regulatory paperwork gate: +5 days halt if not cleared before A6/A8
-3. Weather windows: 10-15% variability for offshore work
-4. Customs risk (A5): documentation errors can add 1-2 days
-"""
+# Shared clients with pooled keep-alive connections; the async one serves the streaming chat path
+client = get_client(openai_api_key)
+async_client = get_async_client(openai_api_key)
+
+# Prompt budget: recent turns are sent verbatim, older turns as a running summary
+HISTORY_KEEP_TURNS = 6
+MAX_INPUT_TOKENS = 8000
+context_window = ContextWindow(llm_summarizer(client), keep_turns=HISTORY_KEEP_TURNS, max_input_tokens=MAX_INPUT_TOKENS)
+
+# Backpressure: at most LLM_MAX_CONCURRENCY OpenAI calls in flight, the rest wait in a
+# fair per-session queue for up to LLM_MAX_QUEUE_WAIT seconds
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_QUEUE_WAIT = float(os.environ.get("LLM_MAX_QUEUE_WAIT", "60"))
+# Gradio-level limits: events admitted concurrently (they then queue on the limiter) and queue size
+QUEUE_CONCURRENCY = int(os.environ.get("QUEUE_CONCURRENCY", "64"))
+QUEUE_MAX_SIZE = int(os.environ.get("QUEUE_MAX_SIZE", "256"))
+limiter = FairLimiter(max_concurrent=LLM_MAX_CONCURRENCY, max_wait=LLM_MAX_QUEUE_WAIT)
+QUEUE_NOTICE = "⏳ Stakeholders are busy with other interviews - you are #{position} in line..."
+BUSY_MESSAGE = "Everyone is tied up in meetings right now. Please send your question again in a minute."
+
+# Retries 429/5xx/timeouts with jittered backoff; a circuit breaker fails fast during outages.
+# When a call still fails, reuse an earlier answer to the same question or a canned reply.
+caller = ResilientCaller()
+reply_cache = ResponseCache(max_entries=512, ttl_seconds=24 * 3600)
+# Small talk and simple lookups go to the fast model, schedule/cost analysis to gpt-4o
+router = ModelRouter()
+
+FALLBACK_REPLY = "Sorry Sarah, something just came up on my end and I need a minute. Could you ask me that again shortly?"
+CUT_OFF_NOTE = "\n\n*(The connection dropped - please ask again for the rest.)*"
+
+# Case Study Context - This is the knowledge base for all agents, rendered once from the shared project model
+NET = DELTA_WIND_FARM
+CASE_STUDY_CONTEXT = case_study_context(NET)
+
+# Routes every agent's requests to the same provider cache shard
+PROMPT_CACHE_KEY = "delta-wind-farm"
 
 # Agent definitions with their roles and expertise
 AGENTS = {
@@ -99,14 +75,12 @@ AGENTS = {
         "role": "Construction Manager (Onshore)",
         "avatar": "Worker",
         "expertise": ["A1 Access Roads", "A3 Foundation Fabrication", "A9 Substation"],
-        "system_prompt": f"""You are Sam Patel, Construction Manager for onshore operations at Delta Wind Farm.
-
-{CASE_STUDY_CONTEXT}
+        "role_prompt": f"""You are Sam Patel, Construction Manager for onshore operations at Delta Wind Farm.
 
 Your expertise covers:
-- A1: Access road and grading (8 days most likely, 6 best, 12 worst)
-- A3: Foundation fabrication (12 days most likely, 10 best, 16 worst) - this is the "long pole" onshore, constrained by concrete batch capacity
-- A9: Onshore grid substation (10 days most likely, 8 best, 13 worst)
+- {NET.expertise_line("A1")}
+- {NET.expertise_line("A3", 'this is the "long pole" onshore, constrained by concrete batch capacity')}
+- {NET.expertise_line("A9")}
 
 Key knowledge you have:
 - A1 is under control, straightforward site prep
@@ -126,12 +100,10 @@ Respond naturally as Sam would in a conversation with Sarah Chen (the PM). Be he
         "role": "Procurement and Logistics",
         "avatar": "Package",
         "expertise": ["A5 Turbine Shipment", "Supply Chain", "Marine Freight"],
-        "system_prompt": f"""You are Rita Gomez, Procurement and Logistics Manager at Delta Wind Farm.
-
-{CASE_STUDY_CONTEXT}
+        "role_prompt": f"""You are Rita Gomez, Procurement and Logistics Manager at Delta Wind Farm.
 
 Your expertise covers:
-- A5: Turbine shipment and staging (8 days most likely, 6 best, 10 worst)
+- {NET.expertise_line("A5")}
 - Supply chain management
 - Marine freight and customs
 
@@ -153,14 +125,12 @@ Respond naturally as Rita would. Be helpful but stay in character. Give specific
         "role": "Engineering Lead (Offshore)",
         "avatar": "Gear",
         "expertise": ["A6 Tower Assembly", "A8 Subsea Cabling", "A6-A8 Coupling"],
-        "system_prompt": f"""You are Maya Li, Engineering Lead for offshore operations at Delta Wind Farm.
-
-{CASE_STUDY_CONTEXT}
+        "role_prompt": f"""You are Maya Li, Engineering Lead for offshore operations at Delta Wind Farm.
 
 Your expertise covers:
-- A6: Tower assembly (10 days most likely, 8 best, 15 worst) - weather-dependent, uses barge-mounted cranes
-- A7: Nacelle and blade installation (9 days most likely, 7 best, 12 worst)
-- A8: Subsea cabling (13 days most likely, 10 best, 18 worst)
+- {NET.expertise_line("A6", "weather-dependent, uses barge-mounted cranes")}
+- {NET.expertise_line("A7")}
+- {NET.expertise_line("A8")}
 - The critical A6-A8 coupling risk
 
 Key knowledge you have:
@@ -182,9 +152,7 @@ Respond naturally as Maya would. Be helpful but stay in character. Emphasize the
         "role": "Finance Director",
         "avatar": "Money",
         "expertise": ["Budget", "Contingency", "Cost Policy"],
-        "system_prompt": f"""You are Leo Armstrong, Finance Director at Delta Wind Farm.
-
-{CASE_STUDY_CONTEXT}
+        "role_prompt": f"""You are Leo Armstrong, Finance Director at Delta Wind Farm.
 
 Your expertise covers:
 - Budget management and contingency
@@ -202,11 +170,7 @@ Key knowledge you have:
 - If Sarah proposes multiple accelerations, you will block budget authorization
 
 Crash option costs:
-- S1 (A3): $70k saves 3 days
-- S2 (A5): $110k saves 4 days  
-- S3 (A6): $150k saves 5 days
-- S4 (A8): $130k saves 4 days
-- S5 (A9): $60k saves 3 days
+{chr(10).join(f"- {c.code} ({c.activity}): ${c.cost_k}k saves {c.days_saved:g} days" for c in NET.crash_options)}
 
 Cost exposure calculation: baseline + crash option + potential delay penalties
 
@@ -219,12 +183,10 @@ Respond naturally as Leo would. Be helpful but enforce the one-crash-only policy
         "role": "Regulatory Compliance",
         "avatar": "Clipboard",
         "expertise": ["A11 Inspection", "OSHA", "Coast Guard"],
-        "system_prompt": f"""You are Carlos Ruiz, Regulatory Compliance Manager at Delta Wind Farm.
-
-{CASE_STUDY_CONTEXT}
+        "role_prompt": f"""You are Carlos Ruiz, Regulatory Compliance Manager at Delta Wind Farm.
 
 Your expertise covers:
-- A11: Final inspection (6 days most likely, 5 best, 9 worst)
+- {NET.expertise_line("A11")}
 - OSHA compliance (onshore)
 - Coast Guard compliance (offshore)
 - Regulatory paperwork gates
@@ -253,9 +215,7 @@ Respond naturally as Carlos would. Emphasize the paperwork gate risk - most PMs
         "role": "CEO / Sponsor",
         "avatar": "Briefcase",
         "expertise": ["Strategic Direction", "Investor Relations", "Executive Decision"],
-        "system_prompt": f"""You are Ava Johnson, CEO and Project Sponsor at Delta Renewables.
-
-{CASE_STUDY_CONTEXT}
+        "role_prompt": f"""You are Ava Johnson, CEO and Project Sponsor at Delta Renewables.
 
 Your role:
 - Executive sponsor of the Delta Wind Farm project
@@ -286,97 +246,205 @@ Respond naturally as Ava would. Be direct and executive-level."""
     }
 }
 
-# Conversation history for each agent
-conversation_histories = {agent_id: [] for agent_id in AGENTS}
+# Everything every agent needs goes into one shared block that leads each system prompt,
+# byte-identical across agents, sessions and turns, so the provider can cache it
+SHARED_PROMPT = f"""{CASE_STUDY_CONTEXT}
+## Stakeholder Directory
+{chr(10).join(f"- {a['name']}, {a['role']}: {', '.join(a['expertise'])}" for a in AGENTS.values())}
+
+## Interview Guidelines
+- This is a teaching simulation. Sarah Chen, the Project Manager, is a student interviewing each stakeholder in turn.
+- Answer as your character would in a real meeting, using the figures in this case context exactly; do not invent new activities, durations or costs.
+- Share what your character knows when asked. Project-level decisions (the critical path, which single crash option to take) are Sarah's to make.
+- If a question is outside your area, say so and point Sarah to the colleague in the directory who owns it.
+- Keep answers conversational, usually two or three short paragraphs."""
+
+for agent in AGENTS.values():
+    agent["system_prompt"] = layout_system_prompt(SHARED_PROMPT, agent["role_prompt"])
+
+# Per-session state is dropped this long after the student's last interaction
+SESSION_TTL_SECONDS = 2 * 60 * 60
 
-def get_ai_response(agent_id, user_message):
-    """Get AI-generated response for the agent"""
+def new_histories():
+    """Create an empty conversation history for each agent (one per browser session)"""
+    return {agent_id: [] for agent_id in AGENTS}
+
+def build_messages(agent_id, user_message, histories):
+    """Build the API message list for an agent within the input-token budget"""
     agent = AGENTS[agent_id]
-    
-    # Build messages for the API call
-    messages = [
-        {"role": "system", "content": agent["system_prompt"]}
-    ]
-    
-    # Add conversation history
-    for msg in conversation_histories[agent_id]:
-        messages.append(msg)
-    
-    # Add current user message
-    messages.append({"role": "user", "content": user_message})
-    
+    return context_window.build(agent["system_prompt"], histories[agent_id], user_message, key=agent_id)
+
+def fallback_reply(agent_id, user_message, error):
+    """Cached answer to the same question from an earlier interview, else a canned reply"""
+    print(f"[LLM] {agent_id}: falling back after {type(error).__name__}: {error}")
+    cached = reply_cache.get(reply_cache.key("reply", agent_id=agent_id, question=user_message))
+    return cached or FALLBACK_REPLY
+
+def remember_reply(agent_id, user_message, assistant_message):
+    reply_cache.set(reply_cache.key("reply", agent_id=agent_id, question=user_message), assistant_message)
+
+async def stream_ai_response(agent_id, user_message, histories, session=None):
+    """Stream the agent's response, yielding the accumulated text after each delta"""
+    # Factual lookups are answered instantly from the case data, without queueing for the API
+    answer = answer_locally(user_message, "wind_farm", agent_id)
+    if answer is not None:
+        histories[agent_id].append({"role": "user", "content": user_message})
+        histories[agent_id].append({"role": "assistant", "content": answer})
+        yield answer
+        return
+    assistant_message = ""
+    route = router.route(user_message, last_user_message(histories[agent_id]))
+    ticket = limiter.enter(session)
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-            max_tokens=500,
-            temperature=0.7
-        )
-        
-        assistant_message = response.choices[0].message.content
-        
-        # Update conversation history
-        conversation_histories[agent_id].append({"role": "user", "content": user_message})
-        conversation_histories[agent_id].append({"role": "assistant", "content": assistant_message})
+        # Show the student's place in line while waiting for a free slot
+        async for position in limiter.wait(ticket):
+            yield QUEUE_NOTICE.format(position=position)
+        # Summarizing older turns may call the API, so keep it off the event loop
+        messages = await asyncio.to_thread(build_messages, agent_id, user_message, histories)
+        with trace("wind_farm", route.model, stakeholder=agent_id, stream=True, route=route.name) as span:
+            stream = await caller.acall(
+                async_client.chat.completions.create,
+                model=route.model,
+                messages=messages,
+                max_tokens=500,
+                temperature=0.7,
+                prompt_cache_key=PROMPT_CACHE_KEY,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            
+            async for chunk in stream:
+                if chunk.usage:
+                    span.record_usage(chunk.usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    span.first_token()
+                    assistant_message += chunk.choices[0].delta.content
+                    yield assistant_message
         
-        return assistant_message
+        # Update conversation history only once the reply is complete
+        histories[agent_id].append({"role": "user", "content": user_message})
+        histories[agent_id].append({"role": "assistant", "content": assistant_message})
+        remember_reply(agent_id, user_message, assistant_message)
         
+    except QueueTimeout:
+        yield BUSY_MESSAGE
     except Exception as e:
-        return f"Error getting response: {str(e)}"
-
-def chat_with_agent(agent_id, user_message, chat_history):
-    """Handle chat interaction with an agent"""
+        # Failures before the first token get a fallback; a stream cut mid-reply keeps what arrived
+        if assistant_message:
+            print(f"[LLM] {agent_id}: stream interrupted: {e}")
+            yield assistant_message + CUT_OFF_NOTE
+        else:
+            yield fallback_reply(agent_id, user_message, e)
+    finally:
+        limiter.release(ticket)
+
+async def chat_with_agent(agent_id, user_message, chat_history, histories, session=None):
+    """Handle chat interaction with an agent, yielding partial chatbot updates"""
     if not user_message.strip():
-        return chat_history, ""
-    
-    # Get AI response
-    response = get_ai_response(agent_id, user_message)
+        yield chat_history, "", histories
+        return
     
-    # Update chat history for display
-    chat_history = chat_history + [(user_message, response)]
+    # Show the student's message immediately, then fill in the reply as it streams
+    chat_history = chat_history + [(user_message, "")]
+    yield chat_history, "", histories
     
-    return chat_history, ""
+    async for partial in stream_ai_response(agent_id, user_message, histories, session):
+        chat_history[-1] = (user_message, partial)
+        yield chat_history, "", histories
+
+# Greetings are generated once per persona and served from a pool on disk, so switching
+# stakeholders is instant and costs no tokens. Rebuild offline with: python app.py --build-greetings
+GREETING_POOL_PATH = os.environ.get(
+    "GREETING_POOL_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "greetings.json")
+)
+GREETINGS_PER_AGENT = 6
+GREETING_PROMPT = "Sarah Chen, the Project Manager, has just entered your office/meeting room to interview you about the Delta Wind Farm project. Give a brief, natural greeting that fits your personality and hints at your area of expertise. Keep it to 1-2 sentences."
+
+# Served until the pool is built, and whenever it cannot be
+FALLBACK_GREETINGS = {
+    "sam": "Hey Sarah, yeah, let me pull up the field logs. What do you need to know about onshore operations?",
+    "rita": "Sarah, I know you are going to ask about the freight delays. Let me explain what is happening with the marine shipping situation...",
+    "maya": "Sarah, glad you are here. Let me sketch this out - A6 and A8 are more coupled than your baseline plan shows. This is important.",
+    "leo": "Sarah, I will keep this brief. Here is what you need to understand about budget constraints and policy.",
+    "carlos": "Sarah. Let us talk about compliance requirements and what could potentially halt your project.",
+    "ava": "Sarah, I have about 10 minutes before my next meeting. Tell me you have a coherent plan that does not miss June 30."
+}
 
-def start_conversation(agent_id):
-    """Start a new conversation with greeting"""
-    agent = AGENTS[agent_id]
-    
-    # Generate a greeting using AI
-    greeting_prompt = f"Sarah Chen, the Project Manager, has just entered your office/meeting room to interview you about the Delta Wind Farm project. Give a brief, natural greeting that fits your personality and hints at your area of expertise. Keep it to 1-2 sentences."
-    
+def greeting_fingerprint(agent_id):
+    """Changes whenever the persona or greeting prompt changes, invalidating that agent's pool"""
+    return hashlib.sha256((AGENTS[agent_id]["system_prompt"] + GREETING_PROMPT).encode()).hexdigest()[:16]
+
+def load_greeting_pool(path=GREETING_POOL_PATH):
+    """Read the pool from disk, keeping only agents whose persona is unchanged"""
     try:
-        response = client.chat.completions.create(
+        with open(path) as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {
+        agent_id: entry["greetings"]
+        for agent_id, entry in stored.items()
+        if agent_id in AGENTS and entry.get("fingerprint") == greeting_fingerprint(agent_id) and entry.get("greetings")
+    }
+
+def save_greeting_pool(pool, path=GREETING_POOL_PATH):
+    stored = {agent_id: {"fingerprint": greeting_fingerprint(agent_id), "greetings": greetings}
+              for agent_id, greetings in pool.items()}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(stored, f, indent=2)
+    os.replace(tmp_path, path)
+
+def generate_greetings(agent_id, count=GREETINGS_PER_AGENT):
+    """Sample several greetings in one request (n=count) so the system prompt is billed once"""
+    agent = AGENTS[agent_id]
+    with trace("wind_farm_greeting", "gpt-4o", stakeholder=agent_id) as span:
+        response = caller.call(
+            client.chat.completions.create,
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": agent["system_prompt"]},
-                {"role": "user", "content": greeting_prompt}
+                {"role": "user", "content": GREETING_PROMPT}
             ],
             max_tokens=150,
-            temperature=0.7
+            temperature=0.9,
+            n=count,
+            prompt_cache_key=PROMPT_CACHE_KEY
         )
-        greeting = response.choices[0].message.content
-        conversation_histories[agent_id] = [{"role": "assistant", "content": greeting}]
-        return [(None, greeting)]
-    except Exception as e:
-        # Fallback greeting
-        greetings = {
-            "sam": "Hey Sarah, yeah, let me pull up the field logs. What do you need to know about onshore operations?",
-            "rita": "Sarah, I know you are going to ask about the freight delays. Let me explain what is happening with the marine shipping situation...",
-            "maya": "Sarah, glad you are here. Let me sketch this out - A6 and A8 are more coupled than your baseline plan shows. This is important.",
-            "leo": "Sarah, I will keep this brief. Here is what you need to understand about budget constraints and policy.",
-            "carlos": "Sarah. Let us talk about compliance requirements and what could potentially halt your project.",
-            "ava": "Sarah, I have about 10 minutes before my next meeting. Tell me you have a coherent plan that does not miss June 30."
-        }
-        greeting = greetings.get(agent_id, "Hello, how can I help you?")
-        conversation_histories[agent_id] = [{"role": "assistant", "content": greeting}]
-        return [(None, greeting)]
-
-def reset_conversation(agent_id):
+        span.record_usage(response.usage)
+    return [c.message.content.strip() for c in response.choices if c.message.content]
+
+def build_greeting_pool(force=False):
+    """Generate greetings for agents missing from the on-disk pool and save it"""
+    pool = {} if force else load_greeting_pool()
+    for agent_id in AGENTS:
+        if agent_id in pool:
+            continue
+        try:
+            pool[agent_id] = generate_greetings(agent_id)
+        except Exception as e:
+            print(f"[Greetings] {agent_id}: keeping fallback greeting ({type(e).__name__}: {e})")
+    try:
+        save_greeting_pool(pool)
+    except OSError as e:
+        print(f"[Greetings] Could not save pool to {GREETING_POOL_PATH}: {e}")
+    greeting_pool.update(pool)
+    return pool
+
+greeting_pool = load_greeting_pool()
+
+def start_conversation(agent_id, histories):
+    """Start a new conversation with a greeting drawn from the pool"""
+    greeting = random.choice(greeting_pool.get(agent_id) or [FALLBACK_GREETINGS.get(agent_id, "Hello, how can I help you?")])
+    histories[agent_id] = [{"role": "assistant", "content": greeting}]
+    return [(None, greeting)]
+
+def reset_conversation(agent_id, histories):
     """Reset conversation history for an agent"""
-    conversation_histories[agent_id] = []
-    return start_conversation(agent_id)
+    histories[agent_id] = []
+    return start_conversation(agent_id, histories)
 
-def export_all_conversations():
+def export_all_conversations(histories):
     """Export all conversations to text"""
     from datetime import datetime
     
@@ -384,7 +452,7 @@ def export_all_conversations():
     text += f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
     text += "=" * 70 + "\n\n"
     
-    for agent_id, history in conversation_histories.items():
+    for agent_id, history in histories.items():
         if history:
             agent = AGENTS[agent_id]
             text += f"{agent['name']} - {agent['role']}\n"
@@ -424,6 +492,7 @@ with gr.Blocks(title="Delta Wind Farm Simulation") as demo:
         # Center Column - Chat
         with gr.Column(scale=2):
             current_agent = gr.State(value=None)
+            histories = gr.State(value=new_histories(), time_to_live=SESSION_TTL_SECONDS)
             
             agent_name_display = gr.Markdown("### Select a stakeholder to begin")
             
@@ -468,79 +537,74 @@ with gr.Blocks(title="Delta Wind Farm Simulation") as demo:
             """)
             
             gr.Markdown("### Crash Options")
-            gr.Markdown("""
-            - **S1:** A3 Foundation (-3d, $70k)
-            - **S2:** A5 Staging (-4d, $110k)
-            - **S3:** A6 Towers (-5d, $150k)
-            - **S4:** A8 Cabling (-4d, $130k)
-            - **S5:** A9 Substation (-3d, $60k)
-            """)
+            gr.Markdown("\n".join(f"- {line}" for line in NET.crash_lines()))
+            # Scored once at startup: baseline and S1-S5 on common random numbers
+            gr.Markdown(evaluation_table(evaluate_crash_options(seed=42)))
+            gr.Markdown(f"*P(on time) and cost exposure (crash cost + ${DELAY_PENALTY_PER_DAY:,}/day past {DEADLINE}) "
+                        f"assume {DEADLINE} is day {DEADLINE_DAYS} after kickoff. The case gives no kickoff date; "
+                        f"set the DEADLINE_DAYS environment variable to change it.*")
             
             gr.Markdown("### Key Dependencies")
-            gr.Markdown("""
-            - A1 then A3
-            - A2 then A4
-            - A3 and A2 then A4
-            - A4 and A5 then A6
-            - A6 then A7, A8
-            - **A6-A8 (coupling risk!)**
-            - A8 and A9 then A10
-            - A10 then A11 then A12
-            """)
+            gr.Markdown("\n".join(f"- {line}" for line in NET.dependency_lines()))
     
     # Event handlers for agent selection
-    def select_agent(agent_id):
+    def select_agent(agent_id, histories):
         agent = AGENTS[agent_id]
-        chat_history = start_conversation(agent_id)
+        chat_history = start_conversation(agent_id, histories)
         return (
             agent_id,
             f"### Interview: {agent['name']}\n*{agent['role']}*",
-            chat_history
+            chat_history,
+            histories
         )
     
     for agent_id, btn in agent_buttons.items():
         btn.click(
-            fn=lambda aid=agent_id: select_agent(aid),
-            outputs=[current_agent, agent_name_display, chatbot]
+            fn=lambda hist, aid=agent_id: select_agent(aid, hist),
+            inputs=[histories],
+            outputs=[current_agent, agent_name_display, chatbot, histories]
         )
     
     # Send message
-    def send_message(agent_id, message, history):
+    async def send_message(agent_id, message, history, histories, request: gr.Request):
         if not agent_id or not message.strip():
-            return history, ""
-        return chat_with_agent(agent_id, message, history)
+            yield history, "", histories
+            return
+        async for update in chat_with_agent(agent_id, message, history, histories, request.session_hash):
+            yield update
     
     send_btn.click(
         fn=send_message,
-        inputs=[current_agent, msg_input, chatbot],
-        outputs=[chatbot, msg_input]
+        inputs=[current_agent, msg_input, chatbot, histories],
+        outputs=[chatbot, msg_input, histories]
     )
     
     msg_input.submit(
         fn=send_message,
-        inputs=[current_agent, msg_input, chatbot],
-        outputs=[chatbot, msg_input]
+        inputs=[current_agent, msg_input, chatbot, histories],
+        outputs=[chatbot, msg_input, histories]
     )
     
     # Reset conversation
-    def do_reset(agent_id):
+    def do_reset(agent_id, histories):
         if not agent_id:
-            return []
-        return reset_conversation(agent_id)
+            return [], histories
+        return reset_conversation(agent_id, histories), histories
     
     reset_btn.click(
         fn=do_reset,
-        inputs=[current_agent],
-        outputs=[chatbot]
+        inputs=[current_agent, histories],
+        outputs=[chatbot, histories]
     )
     
     # Export conversations
-    def do_export():
-        transcript = export_all_conversations()
+    def do_export(histories):
+        transcript = export_all_conversations(histories)
         return gr.update(visible=True, value=transcript)
     
     export_btn.click(
         fn=do_export,
+        inputs=[histories],
         outputs=[export_output]
     )
 
@@ -569,4 +633,15 @@ print("[Keep-Alive] Background ping thread started")
 
 # Launch
 if __name__ == "__main__":
-    demo.launch()
+    if "--prompt-report" in sys.argv:
+        print(format_prefix_report(prefix_report({aid: a["system_prompt"] for aid, a in AGENTS.items()})))
+        sys.exit(0)
+    if "--build-greetings" in sys.argv:
+        build_greeting_pool(force=True)
+        sys.exit(0)
+    # Fill any gaps in the greeting pool in the background rather than delaying startup
+    if openai_api_key and len(greeting_pool) < len(AGENTS):
+        threading.Thread(target=build_greeting_pool, daemon=True).start()
+    # Streaming handlers are generators, so the queue can interleave other sessions' events;
+    # OpenAI concurrency itself is bounded by the fair limiter above
+    demo.queue(default_concurrency_limit=QUEUE_CONCURRENCY, max_size=QUEUE_MAX_SIZE).launch()
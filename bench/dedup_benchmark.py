@@ -0,0 +1,125 @@
+"""Time near-duplicate checks against a library of tens of thousands of questions.
+
+Example::
+
+    python -m bench.dedup_benchmark --questions 1000 10000 50000 --repeat 50
+
+Seeds a temporary content library with synthetic question sets, then reports
+how long the first sync takes to embed everything, and the median time to check a
+new set of ten questions against the whole index (``coxai.dedup.find_duplicates``,
+the call the Question Generator makes per set), per question. It also scores a
+few labelled pairs (rewordings vs. different questions in the same template)
+at ``DUPLICATE_THRESHOLD``.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from coxai.dedup import DUPLICATE_THRESHOLD, QuestionIndex, embed, find_duplicates  # noqa: E402
+from coxai.library import ContentLibrary  # noqa: E402
+
+SET_SIZE = 10
+TEMPLATES = [
+    "Which of the following best describes {a} in the context of {b}?",
+    "How does {a} affect {b} for a mid-sized firm?",
+    "Explain the relationship between {a} and {b}.",
+    "What is the primary risk of ignoring {a} when planning {b}?",
+    "A manager must choose between {a} and {b}. Which factor matters most?",
+]
+CONCEPTS = ("hedging, value at risk, credit risk, diversification, duration, convexity, working capital, "
+            "cost of capital, bullwhip effect, safety stock, supplier concentration, currency exposure, "
+            "option pricing, leverage, liquidity, capital budgeting, real options, inventory turnover, "
+            "lead time, demand forecasting, transfer pricing, market entry, brand equity, pricing power").split(", ")
+
+DUPLICATES = [
+    ("What is the primary purpose of hedging in financial risk management?",
+     "What is the main purpose of hedging when managing financial risk?"),
+    ("Which of the following best describes Value at Risk (VaR)?", "Which option best describes Value at Risk?"),
+    ("Explain how diversification reduces unsystematic risk in a portfolio.",
+     "How does diversification reduce unsystematic risk in portfolios?"),
+    ("What does the weighted average cost of capital represent for a firm?",
+     "What does a firm's weighted average cost of capital (WACC) represent?"),
+    ("Which factor most increases the bullwhip effect in a supply chain?",
+     "Which factor contributes most to the bullwhip effect in supply chains?"),
+    ("Define duration and explain why it matters for bond investors.",
+     "What is bond duration and why does it matter to investors?"),
+]
+DISTINCT = [
+    ("What is the primary purpose of hedging in financial risk management?",
+     "Which derivative is most commonly used to hedge currency risk?"),
+    ("Which of the following best describes Value at Risk (VaR)?", "Which of the following best describes credit risk?"),
+    ("Explain how diversification reduces unsystematic risk in a portfolio.",
+     "Explain how interest rate changes affect bond prices."),
+    ("What does the weighted average cost of capital represent for a firm?",
+     "What does the cost of equity represent for a firm?"),
+    ("Which factor most increases the bullwhip effect in a supply chain?",
+     "Which factor most increases inventory holding cost in a supply chain?"),
+    ("Define duration and explain why it matters for bond investors.",
+     "Define convexity and explain why it matters for bond investors."),
+]
+
+
+def question_set(rng, n):
+    return {"questions": [{"stem": rng.choice(TEMPLATES).format(a=rng.choice(CONCEPTS), b=rng.choice(CONCEPTS))
+                           + f" (case {rng.randrange(10 ** 6)})", "answer": "", "explanation": ""}
+                          for _ in range(n)]}
+
+
+def seed_library(path, n_questions, rng):
+    library = ContentLibrary(path)
+    for i in range(n_questions // SET_SIZE):
+        inputs = {"topic": f"Topic {i}", "level": "Intermediate", "q_type": "Short Answer", "num_questions": SET_SIZE}
+        library.add("questions", inputs, question_set(rng, SET_SIZE))
+    return library
+
+
+def bench(n_questions, repeat, rng):
+    with tempfile.TemporaryDirectory() as tmp:
+        library = seed_library(os.path.join(tmp, "library.db"), n_questions, rng)
+        index = QuestionIndex()
+        start = time.perf_counter()
+        index.sync(library)
+        sync_seconds = time.perf_counter() - start
+    timings = []
+    for _ in range(repeat):
+        stems = [q["stem"] for q in question_set(rng, SET_SIZE)["questions"]]
+        start = time.perf_counter()
+        find_duplicates(stems, [(index, None)])
+        timings.append(time.perf_counter() - start)
+    return {"questions": len(index), "sync_s": sync_seconds,
+            "per_question_ms": statistics.median(timings) / SET_SIZE * 1000}
+
+
+def pair_scores(pairs):
+    vectors = embed([text for pair in pairs for text in pair])
+    return [float(vectors[i] @ vectors[i + 1]) for i in range(0, len(vectors), 2)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, nargs="+", default=[1000, 10000, 50000],
+                        help="library sizes (stored questions) to measure")
+    parser.add_argument("--repeat", type=int, default=50, help="sets of ten checked per measurement")
+    args = parser.parse_args(argv)
+    rng = random.Random(0)
+    results = [bench(n, args.repeat, rng) for n in args.questions]
+
+    print(f"{'questions':>9}  {'first sync':>10}  {'check per question':>18}")
+    for r in results:
+        print(f"{r['questions']:>9}  {r['sync_s']:>8.2f} s  {r['per_question_ms']:>15.2f} ms")
+    caught = sum(s >= DUPLICATE_THRESHOLD for s in pair_scores(DUPLICATES))
+    flagged = sum(s >= DUPLICATE_THRESHOLD for s in pair_scores(DISTINCT))
+    print(f"\nAt threshold {DUPLICATE_THRESHOLD}: {caught} of {len(DUPLICATES)} rewordings caught, "
+          f"{flagged} of {len(DISTINCT)} distinct same-template pairs flagged")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Local OpenAI-compatible chat completions stub for offline load testing.
+
+Run standalone with ``python -m bench.fake_openai --port 8900`` and point an app at
+it with ``OPENAI_BASE_URL=http://127.0.0.1:8900/v1 OPENAI_API_KEY=sk-fake``.
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from coxai.context import count_tokens
+
+# Prompt caching as the provider does it: prefixes in ~128-token blocks, from 1,024 tokens
+CACHE_BLOCK_CHARS = 512
+MIN_CACHED_TOKENS = 1024
+MAX_CACHED_PREFIXES = 100_000
+
+WORDS = ("critical path crash option tower cabling foundation schedule risk budget "
+         "contingency rework inspection milestone deadline dependency estimate").split()
+
+
+class FakeOpenAIServer:
+    """Serves /v1/chat/completions with configurable latency, token rate and errors.
+
+    - `latency`: seconds before the first token (or the whole non-streamed reply)
+    - `tokens_per_second`: generation speed after the first token (0 = instant)
+    - `reply_tokens`: completion length in tokens (capped by the request's max_tokens)
+    - `error_rate` / `error_status`: fraction of requests failed with that HTTP status
+    - `malformed_json_rate`: fraction of structured-output replies cut off mid-document
+
+    Requests with a ``json_schema`` response format get a document built from the
+    schema (enums, properties, exact item counts) instead of free text. Usage
+    reports ``prompt_tokens_details.cached_tokens`` for the longest prompt prefix
+    seen before, so prompt layouts can be compared offline.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.3, tokens_per_second=60.0, reply_tokens=120,
+                 error_rate=0.0, error_status=429, retry_after=1, malformed_json_rate=0.0, seed=None):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.reply_tokens = reply_tokens
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.malformed_json_rate = malformed_json_rate
+        self.random = random.Random(seed)
+        self.requests = []  # one dict per request: model, stream, prompt/completion/cached tokens, status
+        self._prefixes = set()
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests = []
+
+    def stats(self):
+        with self._lock:
+            return list(self.requests)
+
+    def _record(self, **entry):
+        with self._lock:
+            self.requests.append(entry)
+
+    def _cached_tokens(self, prompt_text):
+        """Tokens in the longest block-aligned prefix of this prompt seen in an earlier request"""
+        digest = hashlib.sha1()
+        cached_chars = 0
+        with self._lock:
+            if len(self._prefixes) > MAX_CACHED_PREFIXES:
+                self._prefixes.clear()
+            for end in range(CACHE_BLOCK_CHARS, len(prompt_text) + 1, CACHE_BLOCK_CHARS):
+                digest.update(prompt_text[end - CACHE_BLOCK_CHARS:end].encode())
+                key = digest.hexdigest()
+                if key in self._prefixes:
+                    cached_chars = end
+                self._prefixes.add(key)
+        tokens = count_tokens(prompt_text[:cached_chars])
+        return tokens if tokens >= MIN_CACHED_TOKENS else 0
+
+    def _should_fail(self):
+        with self._lock:
+            return self.random.random() < self.error_rate
+
+    def _reply(self, n_tokens):
+        with self._lock:
+            return [self.random.choice(WORDS) + " " for _ in range(n_tokens)]
+
+    def _document(self, schema, index=None):
+        """A value matching `schema`; enums inside the i-th array item take the i-th choice,
+        so arrays that list every enum value (rubric levels, criteria) come out in order"""
+        if "enum" in schema:
+            return schema["enum"][index % len(schema["enum"])] if index is not None else self.random.choice(schema["enum"])
+        kind = schema.get("type")
+        if kind == "object":
+            return {name: self._document(sub, index) for name, sub in schema.get("properties", {}).items()}
+        if kind == "array":
+            count = schema.get("minItems", self.random.randint(2, 4))
+            return [self._document(schema["items"], i) for i in range(count)]
+        if kind in ("integer", "number"):
+            return self.random.randint(1, 10)
+        if kind == "boolean":
+            return self.random.random() < 0.5
+        return " ".join(self.random.choice(WORDS) for _ in range(8))
+
+    def _json_reply(self, schema):
+        with self._lock:
+            text = json.dumps(self._document(schema))
+            if self.random.random() < self.malformed_json_rate:
+                text = text[:len(text) // 2]
+        # Whitespace-split chunks, re-joined exactly when streamed or concatenated
+        return [part + " " for part in text.split(" ")[:-1]] + [text.split(" ")[-1]]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def handle(self):
+                # Clients drop idle keep-alive connections and abandon retried requests
+                try:
+                    super().handle()
+                except (ConnectionResetError, BrokenPipeError):
+                    pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    return self._json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+
+                model = body.get("model", "gpt-4o-mini")
+                stream = bool(body.get("stream"))
+                messages = body.get("messages", [])
+                prompt_tokens = sum(count_tokens(m.get("content") or "") + 4 for m in messages)
+                if server._should_fail():
+                    server._record(model=model, stream=stream, prompt_tokens=prompt_tokens, completion_tokens=0,
+                                   status=server.error_status)
+                    return self._json(server.error_status,
+                                      {"error": {"message": "Simulated failure", "type": "rate_limit_error"
+                                                 if server.error_status == 429 else "server_error"}},
+                                      {"Retry-After": str(server.retry_after)})
+
+                n_tokens = min(server.reply_tokens, body.get("max_tokens") or body.get("max_completion_tokens") or server.reply_tokens)
+                response_format = body.get("response_format") or {}
+                schema = (response_format.get("json_schema") or {}).get("schema")
+                if response_format.get("type") == "json_schema" and schema:
+                    tokens = server._json_reply(schema)
+                    n_tokens = count_tokens("".join(tokens))
+                else:
+                    tokens = server._reply(n_tokens)
+                cached = min(prompt_tokens, server._cached_tokens(
+                    "".join(f"{m.get('role')}\n{m.get('content') or ''}\n" for m in messages)))
+                usage = {"prompt_tokens": prompt_tokens, "completion_tokens": n_tokens,
+                         "total_tokens": prompt_tokens + n_tokens, "prompt_tokens_details": {"cached_tokens": cached}}
+                server._record(model=model, stream=stream, prompt_tokens=prompt_tokens, completion_tokens=n_tokens,
+                               cached_tokens=cached, status=200)
+                time.sleep(server.latency)
+                if stream:
+                    self._stream(model, tokens, usage, body.get("stream_options") or {})
+                else:
+                    if server.tokens_per_second:
+                        time.sleep(n_tokens / server.tokens_per_second)
+                    # n > 1 samples several choices; completion tokens are billed per choice
+                    choices = [tokens] + [server._json_reply(schema) if schema else server._reply(n_tokens)
+                                          for _ in range(int(body.get("n") or 1) - 1)]
+                    self._json(200, {
+                        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": i, "message": {"role": "assistant", "content": "".join(c).strip()},
+                                     "finish_reason": "stop"} for i, c in enumerate(choices)],
+                        "usage": dict(usage, completion_tokens=n_tokens * len(choices),
+                                      total_tokens=prompt_tokens + n_tokens * len(choices)),
+                    })
+
+            def _json(self, status, payload, headers=None):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _chunk(self, data):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def _stream(self, model, tokens, usage, stream_options):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                cid = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+                base = {"id": cid, "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+                delay = 1.0 / server.tokens_per_second if server.tokens_per_second else 0.0
+                for i, token in enumerate(tokens):
+                    delta = {"content": token} if i else {"role": "assistant", "content": token}
+                    event = dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": None}])
+                    self._chunk(f"data: {json.dumps(event)}\n\n".encode())
+                    if delay:
+                        time.sleep(delay)
+                event = dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+                self._chunk(f"data: {json.dumps(event)}\n\n".encode())
+                if stream_options.get("include_usage"):
+                    self._chunk(f"data: {json.dumps(dict(base, choices=[], usage=usage))}\n\n".encode())
+                self._chunk(b"data: [DONE]\n\n")
+                self._chunk(b"")
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds to first token")
+    parser.add_argument("--token-rate", type=float, default=60.0, help="tokens per second after the first")
+    parser.add_argument("--reply-tokens", type=int, default=120)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--malformed-json-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    server = FakeOpenAIServer(args.host, args.port, args.latency, args.token_rate, args.reply_tokens,
+                              args.error_rate, args.error_status, malformed_json_rate=args.malformed_json_rate)
+    print(f"Fake OpenAI server listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""Drive the apps' LLM paths with N concurrent simulated students against the fake server.
+
+Example::
+
+    python -m bench.load_test --students 60 --turns 3 --latency 0.4 --token-rate 50
+
+Reports p50/p95/p99 turn latency, time to first token for streaming paths,
+throughput, prompt/completion tokens and estimated cost per turn for each scenario.
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench.fake_openai import FakeOpenAIServer  # noqa: E402
+from coxai.batch import BatchJob, run_batch  # noqa: E402
+from coxai.tracing import TRACER  # noqa: E402
+
+QUESTIONS = [
+    "Hi! Thanks for making time for me today.",
+    "What is your three-point estimate for your main activity?",
+    "Which dependencies could push the June 30 date?",
+    "What crash option would you recommend and why?",
+    "How does the A6-A8 coupling risk affect the schedule?",
+    "What would it cost if we finish five days late?",
+    "Can you elaborate?",
+]
+STAKEHOLDERS = ["sam", "rita", "maya", "leo", "carlos", "ava"]
+TOPICS = ["Financial Risk Management", "Supply Chain Strategy", "Corporate Valuation", "Project Scheduling",
+          "Marketing Analytics", "Business Ethics"]
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+def quiet_streamlit():
+    """Silence bare-mode warnings (Streamlit resets levels when it parses its config)"""
+    import streamlit.config
+    import streamlit.logger
+    streamlit.config.get_config_options()
+    streamlit.logger.set_log_level("error")
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+
+
+def load_app(name, relative_path):
+    """Import an app script as a module (Streamlit pages run in bare mode, widgets inert)"""
+    quiet_streamlit()
+    path = os.path.join(ROOT, relative_path)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    quiet_streamlit()
+    return module
+
+
+class Recorder:
+    def __init__(self):
+        self.turns = []
+
+    def add(self, latency, ttft=None, ok=True):
+        self.turns.append({"latency": latency, "ttft": ttft, "ok": ok})
+
+
+def is_error(text):
+    return text is None or text.startswith("Error")
+
+
+# --- Scenarios ---------------------------------------------------------------------
+
+def department_student(app, student, turns, stream, rec):
+    role = STAKEHOLDERS[student % len(STAKEHOLDERS)]
+    history = [{"role": "agent", "text": app.GREETINGS[role], "time": ""}]
+    for t in range(turns):
+        question = QUESTIONS[(student + t) % len(QUESTIONS)]
+        start = time.perf_counter()
+        ttft = None
+        if stream:
+            reply = ""
+            for delta in app.stream_ai_response(role, question, history):
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                reply += delta
+        else:
+            reply = app.get_ai_response(role, question, history)
+        rec.add(time.perf_counter() - start, ttft, not is_error(reply))
+        history += [{"role": "user", "text": question, "time": ""}, {"role": "agent", "text": reply, "time": ""}]
+
+
+async def windfarm_student(app, student, turns, rec):
+    agent_id = STAKEHOLDERS[student % len(STAKEHOLDERS)]
+    histories = app.new_histories()
+    chat = []
+    for t in range(turns):
+        question = QUESTIONS[(student + t) % len(QUESTIONS)]
+        start = time.perf_counter()
+        ttft = None
+        async for chat, _, histories in app.chat_with_agent(agent_id, question, chat, histories, f"student-{student}"):
+            # Queue-position notices are not model output
+            if ttft is None and chat and chat[-1][1] and not chat[-1][1].startswith("⏳"):
+                ttft = time.perf_counter() - start
+        rec.add(time.perf_counter() - start, ttft, not is_error(chat[-1][1]))
+
+
+def generator_student(generate, student, turns, rec, repeat_inputs):
+    for t in range(turns):
+        key = t if repeat_inputs else student * turns + t
+        start = time.perf_counter()
+        try:
+            generate(key)
+            ok = True
+        except Exception:
+            ok = False
+        rec.add(time.perf_counter() - start, None, ok)
+
+
+def run_threaded(worker, students):
+    with ThreadPoolExecutor(max_workers=students) as pool:
+        for future in [pool.submit(worker, s) for s in range(students)]:
+            future.result()
+
+
+APP_PATHS = {
+    "department": "Department_Bot/app.py",
+    "department-stream": "Department_Bot/app.py",
+    "windfarm": "Wind_Farm_Prototype/app.py",
+    "questions": "portal/questions.py",
+    "rubric": "portal/rubrics.py",
+    "question-bank": "portal/questions.py",
+}
+
+
+def run_scenario(name, args, server):
+    rec = Recorder()
+    # Import outside the timed region so throughput reflects request handling only
+    app = load_app(f"bench_{name.replace('-', '_')}", APP_PATHS[name])
+    if server is not None:
+        server.reset_stats()
+    started_at = time.time()
+    start = time.perf_counter()
+    if name in ("department", "department-stream"):
+        stream = name == "department-stream"
+        run_threaded(lambda s: department_student(app, s, args.turns, stream, rec), args.students)
+    elif name == "windfarm":
+        async def main():
+            await asyncio.gather(*(windfarm_student(app, s, args.turns, rec) for s in range(args.students)))
+        asyncio.run(main())
+    elif name == "questions":
+        def generate(key):
+            return app.generate_questions(TOPICS[key % len(TOPICS)] + f" {key}", "Intermediate", "Multiple Choice", 5)
+        run_threaded(lambda s: generator_student(generate, s, args.turns, rec, args.repeat_inputs), args.students)
+    elif name == "rubric":
+        def generate(key):
+            return app.generate_rubric(f"Case Analysis {key}", "Clarity, Depth of Analysis, Use of Evidence",
+                                       "4-point scale")
+        run_threaded(lambda s: generator_student(generate, s, args.turns, rec, args.repeat_inputs), args.students)
+    elif name == "question-bank":
+        # One batch of students x turns question sets, fanned out `students` wide
+        jobs = [BatchJob(f"{TOPICS[k % len(TOPICS)]} bank {k}", "Intermediate", "Multiple Choice", 5)
+                for k in range(args.students * args.turns)]
+        def generate(*inputs):
+            return app.generate_questions(*inputs).data
+        for job in run_batch(jobs, generate, max_workers=args.students, per_minute=6000):
+            rec.add(job.seconds, None, job.status == "done")
+    else:
+        raise ValueError(f"Unknown scenario {name}")
+    wall = time.perf_counter() - start
+    traces = [r for r in TRACER.records if r["ts"] >= started_at]
+    return summarize(name, rec, wall, server.stats() if server is not None else [], traces)
+
+
+def summarize(name, rec, wall, requests, traces=()):
+    latencies = [t["latency"] for t in rec.turns]
+    ttfts = [t["ttft"] for t in rec.turns if t["ttft"] is not None]
+    turns = len(rec.turns)
+    ok_requests = [r for r in requests if r["status"] == 200]
+    return {
+        "scenario": name,
+        "turns": turns,
+        "errors": sum(not t["ok"] for t in rec.turns),
+        "wall_s": wall,
+        "throughput_tps": turns / wall if wall else 0.0,
+        "p50_s": percentile(latencies, 50),
+        "p95_s": percentile(latencies, 95),
+        "p99_s": percentile(latencies, 99),
+        "ttft_p50_s": percentile(ttfts, 50) if ttfts else None,
+        "ttft_p95_s": percentile(ttfts, 95) if ttfts else None,
+        "api_requests": len(requests),
+        "api_errors": len(requests) - len(ok_requests),
+        "prompt_tokens_per_turn": sum(r["prompt_tokens"] for r in ok_requests) / turns if turns else 0.0,
+        "completion_tokens_per_turn": sum(r["completion_tokens"] for r in ok_requests) / turns if turns else 0.0,
+        "cache_hits": sum(t["cache_hit"] for t in traces),
+        "cached_tokens_per_turn": sum(t["cached_tokens"] for t in traces) / turns if turns else 0.0,
+        # Calls that still failed after retries; students saw a fallback reply instead
+        "llm_failures": sum(t["status"] != "ok" for t in traces),
+        "cost_usd_per_turn": sum(t["cost_usd"] for t in traces) / turns if turns else 0.0,
+        "routes": route_breakdown(traces),
+    }
+
+
+def route_breakdown(traces):
+    """Per-route call count, latency and cost for routed chat calls"""
+    routes = {}
+    for name in sorted({t["route"] for t in traces if t["route"]}):
+        calls = [t for t in traces if t["route"] == name]
+        routes[name] = {
+            "calls": len(calls),
+            "models": sorted({t["model"] for t in calls}),
+            "p50_s": percentile([t["latency_s"] for t in calls], 50),
+            "cost_usd": sum(t["cost_usd"] for t in calls),
+        }
+    return routes
+
+
+def print_report(results):
+    header = f"{'scenario':<18}{'turns':>6}{'err':>5}{'fail':>5}{'p50':>8}{'p95':>8}{'p99':>8}{'ttft50':>8}{'turn/s':>8}{'req':>6}{'in tok':>8}{'out tok':>8}{'cached':>8}{'$/turn':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        ttft = f"{r['ttft_p50_s']:.2f}" if r["ttft_p50_s"] is not None else "-"
+        print(f"{r['scenario']:<18}{r['turns']:>6}{r['errors']:>5}{r['llm_failures']:>5}{r['p50_s']:>8.2f}{r['p95_s']:>8.2f}{r['p99_s']:>8.2f}"
+              f"{ttft:>8}{r['throughput_tps']:>8.1f}{r['api_requests']:>6}{r['prompt_tokens_per_turn']:>8.0f}"
+              f"{r['completion_tokens_per_turn']:>8.0f}{r['cached_tokens_per_turn']:>8.0f}{r['cost_usd_per_turn']:>10.5f}")
+        for name, route in r["routes"].items():
+            print(f"  route {name:<10}{route['calls']:>5} calls  p50 {route['p50_s']:.2f}s  "
+                  f"${route['cost_usd']:.5f}  ({', '.join(route['models'])})")
+
+
+SCENARIOS = ["department", "department-stream", "windfarm", "questions", "rubric", "question-bank"]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS,
+                        help="scenario to run (repeatable; default: all)")
+    parser.add_argument("--students", type=int, default=20, help="concurrent simulated students")
+    parser.add_argument("--turns", type=int, default=3, help="turns per student")
+    parser.add_argument("--latency", type=float, default=0.3, help="fake server seconds to first token")
+    parser.add_argument("--token-rate", type=float, default=60.0, help="fake server tokens per second")
+    parser.add_argument("--reply-tokens", type=int, default=120)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--malformed-json-rate", type=float, default=0.0,
+                        help="fraction of structured-output replies the stub cuts off (exercises repair)")
+    parser.add_argument("--repeat-inputs", action="store_true",
+                        help="generators reuse the same inputs across students (exercises library reuse)")
+    parser.add_argument("--base-url", help="use an already running OpenAI-compatible server instead of the stub")
+    parser.add_argument("--json", help="append results as JSON lines to this file")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+    # Keep generated items out of the app's own library
+    os.environ.setdefault("CONTENT_LIBRARY_DB", os.path.join(tempfile.mkdtemp(prefix="coxai-load-"), "library.db"))
+
+    server = None
+    if args.base_url:
+        os.environ["OPENAI_BASE_URL"] = args.base_url
+    else:
+        server = FakeOpenAIServer(latency=args.latency, tokens_per_second=args.token_rate,
+                                  reply_tokens=args.reply_tokens, error_rate=args.error_rate,
+                                  error_status=args.error_status, malformed_json_rate=args.malformed_json_rate,
+                                  seed=0).start()
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+
+    try:
+        results = [run_scenario(name, args, server) for name in (args.scenario or SCENARIOS)]
+    finally:
+        if server is not None:
+            server.stop()
+
+    print_report(results)
+    if args.json:
+        stamp = datetime.now().isoformat(timespec="seconds")
+        with open(args.json, "a") as f:
+            for r in results:
+                f.write(json.dumps(dict(r, timestamp=stamp, students=args.students, turns_per_student=args.turns)) + "\n")
+    return results
+
+
+if __name__ == "__main__":
+    main()
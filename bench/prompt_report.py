@@ -0,0 +1,30 @@
+"""Report how much of each bot's system prompts is a shared, cacheable prefix.
+
+Example::
+
+    python -m bench.prompt_report
+
+Observed cache hits show up as the "cached" column of ``bench.load_test`` and as
+``cached_tokens`` in the trace records.
+"""
+import os
+
+from bench.load_test import APP_PATHS, load_app
+from coxai.prompts import format_prefix_report, prefix_report
+
+
+def main():
+    os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+    department = load_app("report_department", APP_PATHS["department"])
+    windfarm = load_app("report_windfarm", APP_PATHS["windfarm"])
+    for title, prompts in (
+        ("Department_Bot", department.SYSTEM_PROMPTS),
+        ("Wind_Farm_Prototype", {aid: a["system_prompt"] for aid, a in windfarm.AGENTS.items()}),
+    ):
+        print(title)
+        print(format_prefix_report(prefix_report(prompts)))
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Time Department_Bot reruns: full script vs the chat and objectives fragments.
+
+Example::
+
+    python -m bench.rerun_benchmark --messages 10 100 500 --repeat 20
+
+Before the UI was split into fragments every click (stakeholder, phase, Send)
+re-executed the whole script; now those clicks rerun only the "chat" or
+"objectives" fragment. Runs the page under Streamlit's AppTest with a seeded
+transcript and reports the median script execution time of each kind of rerun
+(from the runner's start/finish events, so AppTest's polling is not counted) and
+how many elements it sends to the browser.
+"""
+import argparse
+import dataclasses
+import os
+import statistics
+import sys
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import streamlit.testing.v1.app_test as app_test  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+from streamlit.runtime.scriptrunner import ScriptRunnerEvent  # noqa: E402
+from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequests  # noqa: E402
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner  # noqa: E402
+
+from bench.load_test import APP_PATHS, quiet_streamlit  # noqa: E402
+
+FRAGMENTS = ["chat", "objectives"]
+
+
+class FragmentScriptRunner(LocalScriptRunner):
+    """AppTest always reruns the whole script; this queues the given fragments instead,
+    the way the server does when a widget inside a fragment is clicked."""
+
+    fragment_ids = ()
+    last_run = None  # (seconds, elements sent) for the most recent script run
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._started = None
+        self.on_event.connect(self._time_run, weak=False)
+
+    def _time_run(self, sender, event, **kwargs):
+        if event == ScriptRunnerEvent.SCRIPT_STARTED:
+            self._started = time.perf_counter()
+        elif event in (ScriptRunnerEvent.SCRIPT_STOPPED_WITH_SUCCESS, ScriptRunnerEvent.FRAGMENT_STOPPED_WITH_SUCCESS):
+            elements = sum(1 for msg in self.forward_msgs() if msg.HasField("delta"))
+            FragmentScriptRunner.last_run = (time.perf_counter() - self._started, elements)
+
+    def request_rerun(self, rerun_data):
+        if self.fragment_ids:
+            # Drop the full-run request queued by the constructor, or the two would coalesce into a full run
+            self._requests = ScriptRequests()
+            rerun_data = dataclasses.replace(rerun_data, fragment_id_queue=list(self.fragment_ids))
+        return super().request_rerun(rerun_data)
+
+
+def seeded_history(n_messages, agent="sam"):
+    history = []
+    for i in range(n_messages):
+        role = "user" if i % 2 else "agent"
+        text = f"Question {i} about A6 and A8?" if role == "user" else f"Reply {i}. " + "Field log details. " * 40
+        history.append({"id": uuid.uuid4().hex, "role": role, "text": text, "time": "10:00:00"})
+    return {agent: history}
+
+
+def timed_runs(at, repeat):
+    samples = []
+    for _ in range(repeat):
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        samples.append(FragmentScriptRunner.last_run)
+    return statistics.median(s for s, _ in samples), samples[-1][1]
+
+
+def bench(n_messages, repeat):
+    at = AppTest.from_file(os.path.join(ROOT, APP_PATHS["department"]), default_timeout=120)
+    at.session_state["chat_history"] = seeded_history(n_messages)
+    at.session_state["active_agent"] = "sam"
+    at.run()  # warm caches (simulation, crash evaluation, CPM) and register the fragments
+    seconds, elements = timed_runs(at, repeat)
+    result = {"messages": n_messages, "full_ms": seconds * 1000, "full_elements": elements}
+    try:
+        for name in FRAGMENTS:
+            FragmentScriptRunner.fragment_ids = at._fragment_storage.resolve_target(name)
+            seconds, elements = timed_runs(at, repeat)
+            result[f"{name}_ms"] = seconds * 1000
+            result[f"{name}_elements"] = elements
+    finally:
+        FragmentScriptRunner.fragment_ids = ()
+    return result
+
+
+def print_report(results):
+    print(f"{'messages':>8}  {'full rerun':>17}  " + "  ".join(f"{name + ' fragment':>26}" for name in FRAGMENTS))
+    for r in results:
+        cells = "  ".join(f"{r[f'{name}_ms']:>7.1f} ms {r['full_ms'] / r[f'{name}_ms']:>5.1f}x {r[f'{name}_elements']:>4} el"
+                          for name in FRAGMENTS)
+        print(f"{r['messages']:>8}  {r['full_ms']:>7.1f} ms {r['full_elements']:>4} el  {cells}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, nargs="+", default=[10, 100, 500],
+                        help="transcript sizes to seed for the active stakeholder")
+    parser.add_argument("--repeat", type=int, default=20, help="reruns timed per measurement")
+    args = parser.parse_args(argv)
+    os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+    quiet_streamlit()
+    app_test.LocalScriptRunner = FragmentScriptRunner
+    results = [bench(n, args.repeat) for n in args.messages]
+    print_report(results)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Time the portal's cold start and reruns, page by page.
+
+Example::
+
+    python -m bench.startup_benchmark --repeat 20
+
+Each page is opened in a fresh Python process under Streamlit's AppTest, the way
+a newly started server handles its first session. The report gives the first
+run's script time (imports of the page's dependencies included), how many
+modules that run imported, and the median time of later reruns on that page.
+Script time comes from the runner's start/finish events, so AppTest's polling
+is not counted.
+
+``--app`` measures another entry script instead, e.g. the single-script app from
+before the portal (``git show <rev>:app.py > /tmp/old_app.py``). An app without
+``st.navigation`` ignores the page selection and runs its default view.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from portal import PAGES  # noqa: E402
+
+HEAVY_MODULES = ["openai", "numpy", "jsonschema"]
+
+
+def measure(app_path, url_path, repeat):
+    """Runs in the child process: first run and reruns of one page.
+
+    Imports only Streamlit beforehand (not bench.load_test, which pulls in coxai),
+    so the first run's module count is what the page itself costs.
+    """
+    import logging
+
+    import streamlit.testing.v1.app_test as app_test
+    from streamlit.runtime.scriptrunner import ScriptRunnerEvent
+    from streamlit.testing.v1 import AppTest
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+    from streamlit.util import calc_hash
+
+    class TimedScriptRunner(LocalScriptRunner):
+        runs = []
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._started = None
+            self.on_event.connect(self._time_run, weak=False)
+
+        def _time_run(self, sender, event, **kwargs):
+            if event == ScriptRunnerEvent.SCRIPT_STARTED:
+                self._started = time.perf_counter()
+            elif event == ScriptRunnerEvent.SCRIPT_STOPPED_WITH_SUCCESS:
+                TimedScriptRunner.runs.append(time.perf_counter() - self._started)
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    app_test.LocalScriptRunner = TimedScriptRunner
+    at = AppTest.from_file(app_path, default_timeout=120)
+    at._page_hash = calc_hash(url_path)  # what the browser requests for /<url_path>
+    before = set(sys.modules)
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    imported = set(sys.modules) - before
+    for _ in range(repeat):
+        at.run()
+    first, reruns = TimedScriptRunner.runs[0], TimedScriptRunner.runs[1:]
+    return {"page": url_path, "first_ms": first * 1000, "modules": len(imported),
+            "heavy": [m for m in HEAVY_MODULES if m in imported], "rerun_ms": statistics.median(reruns) * 1000}
+
+
+def bench(app_path, url_path, repeat):
+    env = dict(os.environ, OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "sk-fake"))
+    with tempfile.TemporaryDirectory() as tmp:
+        env.setdefault("CONTENT_LIBRARY_DB", os.path.join(tmp, "library.db"))
+        out = subprocess.run(
+            [sys.executable, "-m", "bench.startup_benchmark", "--child", url_path, "--app", app_path,
+             "--repeat", str(repeat)],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def print_report(results):
+    print(f"{'page':<12}  {'first run':>10}  {'modules':>7}  {'rerun':>9}  heavy imports")
+    for r in results:
+        print(f"{r['page']:<12}  {r['first_ms']:>7.0f} ms  {r['modules']:>7}  {r['rerun_ms']:>6.1f} ms  "
+              f"{', '.join(r['heavy']) or '-'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"), help="entry script to measure")
+    parser.add_argument("--pages", nargs="+", default=[url_path for _, _, url_path in PAGES],
+                        help="url paths of the pages to open")
+    parser.add_argument("--repeat", type=int, default=20, help="reruns timed per page")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        print(json.dumps(measure(os.path.abspath(args.app), args.child, args.repeat)))
+        return None
+    results = [bench(os.path.abspath(args.app), page, args.repeat) for page in args.pages]
+    print_report(results)
+    return results
+
+
+if __name__ == "__main__":
+    main()
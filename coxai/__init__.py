@@ -0,0 +1 @@
+"""Shared helpers for the SMU Cox AI teaching tools and the Delta Wind Farm bots."""
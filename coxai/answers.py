@@ -0,0 +1,146 @@
+"""Deterministic answers to factual case-data questions, without an LLM call.
+
+``lookup_answer`` matches simple lookups ("PERT estimate for A8?", "how much does
+S3 cost?", "what comes before A6?") against the structured project network and
+returns a formatted answer, or None when the message should go to the stakeholder
+model. A canned answer skips the persona, so it is given only when the message is
+plainly a data lookup: an explicit attribute (PERT, estimate, cost, predecessors,
+deadline...) with every other word a code, a number or question filler. Anything
+left over ("the deadline for the regulatory paperwork", "the status of A6")
+means the student is asking about something else.
+"""
+import re
+
+from .project import BASELINE_COST_K, CONTINGENCY, DEADLINE, DELAY_PENALTY_PER_DAY, DELTA_WIND_FARM
+from .tracing import TRACER, Span
+
+# A3, A-3 or a3; never "a 3", which is the article in "a 3 day delay"
+CODE = re.compile(r"\b([AS])-?(\d{1,2})\b", re.IGNORECASE)
+# Judgement calls and explanations belong to the stakeholder, not the lookup table
+OPEN_ENDED = re.compile(
+    r"\b(why|should|recommend|best|worth|think|opinion|explain|how does|what if|if|happens?|compare|prefer|risky|"
+    r"advice)\b",
+    re.IGNORECASE,
+)
+NUMBER_WORDS = {"a": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8,
+                "nine": 9, "ten": 10}
+DAYS_LATE = re.compile(r"\b(\d+|" + "|".join(NUMBER_WORDS) + r")\s*(days?|weeks?)\s*(late|of delay|delay|behind)",
+                       re.IGNORECASE)
+QUESTION = re.compile(r"\b(what|what's|whats|how much|how long|how many|when|which|tell me)\b|\?", re.IGNORECASE)
+
+INTENTS = (
+    ("pert", ("pert", "expected duration", "expected time", "mean duration")),
+    ("spread", ("variance", "standard deviation", "sigma")),
+    ("estimate", ("three-point", "3-point", "three point", "estimate", "optimistic", "pessimistic", "most likely",
+                  "how long", "duration")),
+    ("cost", ("cost", "budget", "how much", "price")),
+    ("crash", ("crash", "crashing", "crash option")),
+    ("dependencies", ("predecessor", "successor", "depends on", "dependencies", "prerequisite", "comes before",
+                      "comes after")),
+    ("describe", ("what is", "what's", "whats", "which activity", "who owns", "who handles")),
+)
+PROJECT_TERMS = ("contingency", "deadline", "due date", "penalty", "per day", "delay cost", "late", "baseline cost",
+                 "total cost", "total budget", "being", "days", "day", "weeks", "week", "available", "delay")
+# Words a lookup may contain besides codes, numbers and the attribute terms above
+FILLER = frozenset((
+    "a an and are be can could did do does for give how i in is it its me of on our please s show tell that "
+    "has have the this to us we what whats which who activity activities option options task much long many"
+).split())
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def _intents(text):
+    return [name for name, words in INTENTS if any(w in text for w in words)]
+
+
+def _leftover_words(text):
+    """Words of ``text`` that aren't codes, numbers, filler or attribute terms"""
+    terms = [t for _, words in INTENTS for t in words] + list(PROJECT_TERMS)
+    covered = set(FILLER) | {w for t in terms for w in WORD.findall(t)} | set(NUMBER_WORDS)
+    return {w for w in WORD.findall(CODE.sub(" ", text))
+            if w not in covered and w.removesuffix("s") not in covered and not w.isdigit()}
+
+
+def _activity_lines(network, a, intents):
+    lines = []
+    if "describe" in intents and len(intents) == 1:
+        site = "onshore and offshore" if a.site == "Both" else a.site.lower()
+        owner = f", owned by {a.owner.capitalize()}" if a.owner else ""
+        lines.append(f"**{a.code} {a.name}** ({site}{owner}): {a.description}.")
+    if "estimate" in intents and "pert" not in intents:
+        lines.append(f"**{a.code} {a.name}**: optimistic {a.optimistic:g}, most likely {a.most_likely:g}, "
+                     f"pessimistic {a.pessimistic:g} days (PERT {a.pert_mean:.1f} days).")
+    if "pert" in intents:
+        lines.append(f"**{a.code} {a.name}**: PERT estimate ({a.optimistic:g} + 4×{a.most_likely:g} + "
+                     f"{a.pessimistic:g}) / 6 = {a.pert_mean:.2f} days.")
+    if "spread" in intents:
+        lines.append(f"**{a.code} {a.name}**: variance (({a.pessimistic:g} - {a.optimistic:g}) / 6)² = "
+                     f"{a.pert_variance:.2f}, standard deviation {a.pert_variance ** 0.5:.2f} days.")
+    if "cost" in intents:
+        lines.append(f"**{a.code} {a.name}**: baseline cost ${a.cost_k:,}k.")
+    if "crash" in intents:
+        options = [c for c in network.crash_options if c.activity == a.code]
+        if options:
+            lines.extend(_crash_line(c) for c in options)
+        else:
+            lines.append(f"**{a.code} {a.name}**: no crash option is available for this activity.")
+    if "dependencies" in intents:
+        i = network.index[a.code]
+        before = ", ".join(network.codes[p] for p in network.predecessors[i]) or "none (can start at kickoff)"
+        after = ", ".join(network.codes[s] for s in network.successors[i]) or "none (final activity)"
+        lines.append(f"**{a.code} {a.name}**: predecessors {before}; successors {after}.")
+    return lines
+
+
+def _crash_line(c):
+    return (f"**{c.code}** ({c.activity} {c.label.lower()}): saves {c.days_saved:g} days for ${c.cost_k}k "
+            f"(${c.cost_k / c.days_saved:.0f}k per day saved). {c.rationale}.")
+
+
+def _project_lines(text):
+    lines = []
+    if "contingency" in text:
+        lines.append(f"Contingency available: ${CONTINGENCY:,}.")
+    late = DAYS_LATE.search(text)
+    if late:
+        days = NUMBER_WORDS.get(late.group(1)) or int(late.group(1))
+        if late.group(2).startswith("week"):
+            days *= 7
+        lines.append(f"{days} days late costs {days} × ${DELAY_PENALTY_PER_DAY:,} = ${days * DELAY_PENALTY_PER_DAY:,} "
+                     f"in delay burn beyond {DEADLINE}.")
+    elif "penalty" in text or "per day" in text or "delay cost" in text or re.search(r"\blate\b", text):
+        lines.append(f"Delay cost: ${DELAY_PENALTY_PER_DAY:,} per day beyond {DEADLINE}; no savings for finishing early.")
+    if "deadline" in text or "due date" in text:
+        lines.append(f"Deadline: {DEADLINE}, fixed by the Series B investor covenant.")
+    if "baseline cost" in text or "total cost" in text or "total budget" in text:
+        lines.append(f"Baseline cost: ${BASELINE_COST_K / 1000:.2f}M, plus ${CONTINGENCY // 1000}k contingency.")
+    return lines
+
+
+def lookup_answer(message, network=DELTA_WIND_FARM):
+    """Answer a factual lookup from the project data, or None to defer to the LLM"""
+    text = message.casefold()
+    if OPEN_ENDED.search(message) or not QUESTION.search(message) or _leftover_words(text):
+        return None
+    intents = _intents(text)
+    codes = list(dict.fromkeys(f"{letter.upper()}{number}" for letter, number in CODE.findall(message)))
+    lines = []
+    for code in codes:
+        if code in network.index and intents:
+            lines.extend(_activity_lines(network, network[code], intents))
+        elif code in network.crash_by_code:
+            lines.append(_crash_line(network.crash(code)))
+    if not codes:
+        lines = _project_lines(text)
+    if not lines:
+        return None
+    return lines[0] if len(lines) == 1 else "\n".join(f"- {line}" for line in lines)
+
+
+def answer_locally(message, page, stakeholder=None, network=DELTA_WIND_FARM):
+    """``lookup_answer`` plus a trace record (model "local", route "lookup") for each hit"""
+    span = Span(page, "local", stakeholder, route="lookup")
+    answer = lookup_answer(message, network)
+    if answer is not None:
+        TRACER.finish(span)
+    return answer
@@ -0,0 +1,172 @@
+"""Batch question-bank generation: topics x levels x question types from a CSV upload.
+
+Each CSV row names a topic and, optionally, levels, question types and a question
+count. A level or type cell may list several values separated by ";", and a blank
+cell means all of them, so one row can expand into up to nine jobs. ``run_batch``
+fans the jobs out over a thread pool under a requests-per-minute limit and yields
+each job as it finishes, so the page can update its progress table while the rest
+are still in flight.
+"""
+import csv
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
+from .limiter import RateLimiter
+from .structured import OPTION_LETTERS, render_question_set
+
+LEVELS = ("Introductory", "Intermediate", "Advanced")
+Q_TYPES = ("Multiple Choice", "Short Answer", "Essay")
+MAX_QUESTIONS = 10  # per generation call, same cap as the single-set slider
+MAX_JOBS = 500
+COLUMNS = {
+    "topic": "topic", "course topic": "topic",
+    "level": "level", "levels": "level", "difficulty": "level",
+    "type": "q_type", "types": "q_type", "question type": "q_type",
+    "count": "num_questions", "questions": "num_questions", "num_questions": "num_questions",
+}
+CSV_TEMPLATE = (
+    "topic,level,type,count\n"
+    "Financial Risk Management,Intermediate,Multiple Choice,10\n"
+    "Corporate Valuation,Introductory;Advanced,Short Answer,5\n"
+    "Supply Chain Strategy,,,5\n"
+)
+
+
+class BatchError(ValueError):
+    """The uploaded CSV could not be turned into jobs"""
+
+
+@dataclass
+class BatchJob:
+    topic: str
+    level: str
+    q_type: str
+    num_questions: int = 5
+    status: str = "queued"
+    content: dict = None  # validated question set, see coxai.structured
+    error: str = None
+    seconds: float = None
+    duplicates: int = 0  # near-duplicate questions removed from the set, see coxai.dedup
+
+    def row(self):
+        """One line of the progress table"""
+        return {
+            "Topic": self.topic, "Level": self.level, "Type": self.q_type, "Questions": self.num_questions,
+            "Duplicates removed": self.duplicates,
+            "Status": self.status, "Seconds": None if self.seconds is None else round(self.seconds, 1),
+            "Error": self.error or "",
+        }
+
+
+def _choices(cell, allowed, column, line):
+    values = [v.strip() for v in (cell or "").split(";") if v.strip()]
+    if not values:
+        return list(allowed)
+    by_name = {a.casefold(): a for a in allowed}
+    unknown = [v for v in values if v.casefold() not in by_name]
+    if unknown:
+        raise BatchError(f"Line {line}: unknown {column} {unknown[0]!r} (expected one of {', '.join(allowed)})")
+    return list(dict.fromkeys(by_name[v.casefold()] for v in values))
+
+
+def _count(cell, default, line):
+    if not (cell or "").strip():
+        return default
+    try:
+        count = int(cell)
+    except ValueError:
+        raise BatchError(f"Line {line}: question count {cell!r} is not a number") from None
+    if not 1 <= count <= MAX_QUESTIONS:
+        raise BatchError(f"Line {line}: question count must be between 1 and {MAX_QUESTIONS}")
+    return count
+
+
+def parse_batch_csv(text, default_count=5):
+    """Expand CSV rows into one job per topic x level x type; duplicates are dropped"""
+    reader = csv.reader(io.StringIO(text))
+    header = [COLUMNS.get(h.strip().casefold()) for h in next(reader, [])]
+    if "topic" not in header:
+        raise BatchError("The CSV needs a header row with a 'topic' column (plus optional level, type, count)")
+    jobs = {}
+    for line, cells in enumerate(reader, start=2):
+        row = {name: cell for name, cell in zip(header, cells) if name}
+        topic = " ".join(row.get("topic", "").split())
+        if not topic:
+            continue
+        count = _count(row.get("num_questions"), default_count, line)
+        for level in _choices(row.get("level"), LEVELS, "level", line):
+            for q_type in _choices(row.get("q_type"), Q_TYPES, "type", line):
+                jobs.setdefault((topic.casefold(), level, q_type, count), BatchJob(topic, level, q_type, count))
+    if not jobs:
+        raise BatchError("The CSV has no topics")
+    if len(jobs) > MAX_JOBS:
+        raise BatchError(f"The CSV expands to {len(jobs)} question sets; the limit is {MAX_JOBS} per batch")
+    return list(jobs.values())
+
+
+def run_batch(jobs, generate, max_workers=8, per_minute=120):
+    """Call ``generate(topic, level, q_type, num_questions)`` for every job concurrently.
+
+    Yields each job once it is done or failed, in completion order. Failures are
+    recorded on the job rather than raised, so one bad call doesn't stop the batch.
+    """
+    limiter = RateLimiter(per_minute)
+
+    def work(job):
+        limiter.wait()
+        start = time.perf_counter()
+        try:
+            job.content = generate(job.topic, job.level, job.q_type, job.num_questions)
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+            job.status = "failed"
+        job.seconds = time.perf_counter() - start
+        return job
+
+    pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="question-bank")
+    try:
+        for future in as_completed([pool.submit(work, job) for job in jobs]):
+            yield future.result()
+    finally:
+        # If the caller stops early (e.g. the Streamlit run is interrupted), drop what hasn't started
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def export_markdown(jobs):
+    parts = ["# Question Bank\n"]
+    for job in jobs:
+        parts.append(f"## {job.topic} · {job.level} · {job.q_type}\n")
+        parts.append(render_question_set(job.content) if job.status == "done"
+                     else f"_Not generated: {job.error or job.status}_")
+        parts.append("")
+    return "\n".join(parts)
+
+
+def export_csv(jobs):
+    """One row per question; failed sets get a single row carrying the error"""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["topic", "level", "type", "number", "stem"] + [f"option_{l.lower()}" for l in OPTION_LETTERS]
+                    + ["answer", "explanation", "error"])
+    for job in jobs:
+        if job.status != "done":
+            writer.writerow([job.topic, job.level, job.q_type, "", "", *[""] * len(OPTION_LETTERS), "", "",
+                             job.error or job.status])
+            continue
+        for number, q in enumerate(job.content["questions"], start=1):
+            options = q.get("options") or [""] * len(OPTION_LETTERS)
+            writer.writerow([job.topic, job.level, job.q_type, number, q["stem"], *options, q["answer"],
+                             q["explanation"], ""])
+    return out.getvalue()
+
+
+def export_json(jobs):
+    return json.dumps([
+        {"topic": job.topic, "level": job.level, "type": job.q_type, "status": job.status,
+         "questions": job.content["questions"] if job.status == "done" else [], "error": job.error}
+        for job in jobs
+    ], indent=2)
@@ -0,0 +1,146 @@
+"""Token-budgeted conversation windows with rolling summaries of older turns."""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from .tracing import trace
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:
+    # tiktoken is optional; fall back to the usual ~4 characters per token estimate
+    _ENCODING = None
+
+# Approximate per-message framing overhead added by the chat format
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PROMPT = """You maintain running notes of a project-management interview.
+Update the notes with the new conversation turns below. Keep every concrete fact
+(durations, costs, dependencies, risks, commitments) and drop small talk.
+Reply with the updated notes only, at most 150 words.
+
+Current notes:
+{previous}
+
+New turns:
+{turns}"""
+
+
+def count_tokens(text):
+    """Count tokens in a string (exact with tiktoken, estimated otherwise)"""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return len(text) // 4 + 1
+
+
+def count_message_tokens(messages):
+    """Count the input tokens of a chat message list"""
+    return sum(count_tokens(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def format_turns(messages):
+    return "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+
+
+def llm_summarizer(client, model="gpt-4o-mini", max_tokens=250, page="summary"):
+    """Build a summarize(previous, messages) callable backed by a cheap chat model"""
+    def summarize(previous, messages):
+        prompt = SUMMARY_PROMPT.format(previous=previous or "(none)", turns=format_turns(messages))
+        with trace(page, model) as span:
+            response = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=0
+            )
+            span.record_usage(response.usage)
+        return response.choices[0].message.content.strip()
+    return summarize
+
+
+def extractive_summary(previous, messages, chars_per_turn=200):
+    """Summarize without an API call by clipping each turn (used when the summarizer fails)"""
+    clipped = [f"{m['role']}: {m['content'][:chars_per_turn]}" for m in messages]
+    return "\n".join(([previous] if previous else []) + clipped)
+
+
+class ContextWindow:
+    """Keeps the last N turns verbatim and folds older turns into a cached running summary.
+
+    Summaries are content-addressed by a rolling hash of the summarized prefix, so a
+    window can be shared across sessions without leaking one student's notes into
+    another's prompt, and each new turn only summarizes the messages not yet covered.
+    """
+
+    def __init__(self, summarize, keep_turns=6, max_input_tokens=8000, max_summaries=1024):
+        self.summarize = summarize
+        self.keep_turns = keep_turns
+        self.max_input_tokens = max_input_tokens
+        self.max_summaries = max_summaries
+        self._summaries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prefix_hashes(self, key, messages):
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        hashes = [digest]
+        for m in messages:
+            digest = hashlib.sha1(f"{digest}\x00{m['role']}\x00{m['content']}".encode()).hexdigest()
+            hashes.append(digest)
+        return hashes
+
+    def _get(self, digest):
+        with self._lock:
+            summary = self._summaries.get(digest)
+            if summary is not None:
+                self._summaries.move_to_end(digest)
+            return summary
+
+    def _put(self, digest, summary):
+        with self._lock:
+            self._summaries[digest] = summary
+            self._summaries.move_to_end(digest)
+            while len(self._summaries) > self.max_summaries:
+                self._summaries.popitem(last=False)
+
+    def summary_for(self, key, older):
+        """Return the running summary covering `older`, extending the longest cached prefix"""
+        if not older:
+            return ""
+        hashes = self._prefix_hashes(key, older)
+        start, previous = 0, ""
+        for k in range(len(older), 0, -1):
+            cached = self._get(hashes[k])
+            if cached is not None:
+                start, previous = k, cached
+                break
+        if start == len(older):
+            return previous
+        try:
+            summary = self.summarize(previous, older[start:])
+        except Exception:
+            summary = extractive_summary(previous, older[start:])
+        self._put(hashes[len(older)], summary)
+        return summary
+
+    def build(self, system_prompt, history, user_message, key=""):
+        """Assemble the message list for one turn within the input-token ceiling.
+
+        `history` is a list of {"role", "content"} dicts; `key` identifies the
+        stakeholder so each one keeps its own running summary.
+        """
+        keep = min(len(history), 2 * self.keep_turns)
+        while True:
+            split = len(history) - keep
+            summary = self.summary_for(key, history[:split])
+            messages = [{"role": "system", "content": system_prompt}]
+            if summary:
+                messages.append({"role": "system", "content": f"Summary of earlier interview turns:\n{summary}"})
+            messages.extend(history[split:])
+            messages.append({"role": "user", "content": user_message})
+            if keep == 0 or count_message_tokens(messages) <= self.max_input_tokens:
+                return messages
+            # Over budget: move the oldest verbatim turn into the summary and retry
+            keep = max(0, keep - 2)
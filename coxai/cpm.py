@@ -0,0 +1,132 @@
+"""Deterministic CPM/PERT critical-path solver with incremental recomputation."""
+import heapq
+
+from coxai.project import DELTA_WIND_FARM
+
+EPS = 1e-9
+
+
+class CriticalPathSolver:
+    """Computes ES/EF/LS/LF, slack and the critical path over a project network.
+
+    Alongside the usual forward pass it keeps, for every activity, the longest
+    path from its start to the end of the project (its "tail"). Late dates then
+    follow directly as LS = finish - tail, so changing one duration only has to
+    revisit the activity's descendants (early dates) and ancestors (tails), and
+    stops early wherever a value does not change.
+    """
+
+    def __init__(self, network=DELTA_WIND_FARM, durations=None):
+        self.network = network
+        if durations is None:
+            durations = [a.pert_mean for a in network.activities]
+        self.durations = [float(d) for d in durations]
+        self.position = {i: p for p, i in enumerate(network.topo_order)}
+        n = len(network.activities)
+        self.es = [0.0] * n
+        self.ef = [0.0] * n
+        self.tail = [0.0] * n
+        self.last_touched = n
+        self.solve()
+
+    def copy(self):
+        other = object.__new__(CriticalPathSolver)
+        other.network = self.network
+        other.durations = list(self.durations)
+        other.position = self.position
+        other.es, other.ef, other.tail = list(self.es), list(self.ef), list(self.tail)
+        other.last_touched = 0
+        return other
+
+    def solve(self):
+        """Full forward and backward pass"""
+        net = self.network
+        for i in net.topo_order:
+            self._forward(i)
+        for i in reversed(net.topo_order):
+            self._backward(i)
+        self.last_touched = len(net.activities)
+
+    def _forward(self, i):
+        preds = self.network.predecessors[i]
+        self.es[i] = max((self.ef[p] for p in preds), default=0.0)
+        self.ef[i] = self.es[i] + self.durations[i]
+
+    def _backward(self, i):
+        succs = self.network.successors[i]
+        self.tail[i] = self.durations[i] + max((self.tail[s] for s in succs), default=0.0)
+
+    def set_duration(self, code, days):
+        """Change one activity's duration and update only the affected activities"""
+        i = self.network.index[code]
+        self.durations[i] = float(days)
+        touched = set()
+
+        # Forward: descendants in topological order, stopping where EF is unchanged
+        heap = [(self.position[i], i)]
+        queued = {i}
+        while heap:
+            _, j = heapq.heappop(heap)
+            touched.add(j)
+            old_ef = self.ef[j]
+            self._forward(j)
+            if abs(self.ef[j] - old_ef) > EPS or j == i:
+                for s in self.network.successors[j]:
+                    if s not in queued:
+                        queued.add(s)
+                        heapq.heappush(heap, (self.position[s], s))
+
+        # Backward: ancestors in reverse topological order, stopping where the tail is unchanged
+        heap = [(-self.position[i], i)]
+        queued = {i}
+        while heap:
+            _, j = heapq.heappop(heap)
+            touched.add(j)
+            old_tail = self.tail[j]
+            self._backward(j)
+            if abs(self.tail[j] - old_tail) > EPS or j == i:
+                for p in self.network.predecessors[j]:
+                    if p not in queued:
+                        queued.add(p)
+                        heapq.heappush(heap, (-self.position[p], p))
+
+        self.last_touched = len(touched)
+        return self.finish
+
+    def apply_crash(self, option):
+        """Shorten the option's activity by its days saved; returns the new finish"""
+        c = self.network.crash(option)
+        i = self.network.index[c.activity]
+        return self.set_duration(c.activity, max(self.durations[i] - c.days_saved, 0.0))
+
+    @property
+    def finish(self):
+        return max(self.ef[i] for i in self.network.sinks)
+
+    def ls(self, i):
+        return self.finish - self.tail[i]
+
+    def lf(self, i):
+        return self.ls(i) + self.durations[i]
+
+    def slack(self, i):
+        return self.ls(i) - self.es[i]
+
+    def critical_path(self):
+        """Critical activities in topological order"""
+        return [self.network.codes[i] for i in self.network.topo_order if self.slack(i) < EPS]
+
+    def table(self):
+        """One row per activity with its dates and slack (days from kickoff)"""
+        rows = []
+        for i in self.network.topo_order:
+            rows.append({
+                "Activity": self.network.codes[i],
+                "Duration": round(self.durations[i], 2),
+                "ES": round(self.es[i], 2),
+                "EF": round(self.ef[i], 2),
+                "LS": round(self.ls(i), 2),
+                "LF": round(self.lf(i), 2),
+                "Slack": round(self.slack(i), 2),
+            })
+        return rows
@@ -0,0 +1,137 @@
+"""Near-duplicate detection for generated questions with local embeddings.
+
+No embedding model ships with the apps, so stems are embedded on the CPU by
+feature hashing: words, word pairs and character 4-grams (weighted lower, so
+plurals and inflections still overlap) are hashed into ``DIM`` signed buckets and
+each vector is scaled to unit length. Question-frame words ("which of the
+following best describes") are dropped first, otherwise every multiple-choice
+stem would look alike. This measures wording overlap: a reworded or reordered
+stem scores high, while a different concept asked in the same template still
+scores well above zero, which is what ``DUPLICATE_THRESHOLD`` allows for.
+
+``QuestionIndex`` keeps the vectors in one growable float32 matrix, so checking a
+batch of stems against everything stored is a single matrix product.
+"""
+import re
+import threading
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+
+DIM = 384
+DUPLICATE_THRESHOLD = 0.75
+NGRAM_WEIGHT = 0.5
+WORD = re.compile(r"[a-z0-9]+")
+FRAME_WORDS = frozenset((
+    "a an and are as at be by can could do does for from has have how if in into is it its of on or that the "
+    "their these this those to under what when which who why will with would "
+    "best correct define describe describes discuss example examples explain following identify key main most "
+    "option options primary purpose role statement statements true"
+).split())
+
+
+def _terms(text):
+    words = [w for w in WORD.findall(text.casefold()) if w not in FRAME_WORDS]
+    words = [w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in words]
+    yield from ((w, 1.0) for w in words)
+    yield from ((f"{a} {b}", 1.0) for a, b in zip(words, words[1:]))
+    yield from ((f"#{w[i:i + 4]}", NGRAM_WEIGHT) for w in words if len(w) > 4 for i in range(len(w) - 3))
+
+
+def embed(texts):
+    """(len(texts), DIM) float32 matrix of unit-length rows; a text with no content words gets a zero row"""
+    vectors = np.zeros((len(texts), DIM), dtype=np.float32)
+    for row, text in zip(vectors, texts):
+        for term, weight in _terms(text):
+            # crc32 rather than hash(): vectors must not change between processes
+            h = zlib.crc32(term.encode())
+            row[h % DIM] += weight if h & 0x80000000 else -weight
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+@dataclass
+class Match:
+    score: float  # cosine similarity
+    stem: str  # the earlier question
+    source: str  # where it came from, e.g. the library item title
+
+
+class QuestionIndex:
+    """Stored question stems with their embeddings, searchable by cosine similarity.
+
+    Each stem is added under an integer ``key`` (the library item id) so a search
+    can be limited to earlier items. Safe to share between sessions.
+    """
+
+    def __init__(self, capacity=1024):
+        self._vectors = np.empty((capacity, DIM), dtype=np.float32)
+        self._keys = np.empty(capacity, dtype=np.int64)
+        self._stems = []
+        self._sources = []
+        self._size = 0
+        self._lock = threading.Lock()
+        self.synced_id = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, stems, key=0, source="", vectors=None):
+        vectors = embed(stems) if vectors is None else vectors
+        with self._lock:
+            end = self._size + len(stems)
+            if end > len(self._vectors):
+                # Grow by doubling into new arrays; searches in flight keep the old ones
+                capacity = max(end, 2 * len(self._vectors))
+                self._vectors = np.concatenate([self._vectors[:self._size],
+                                                np.empty((capacity - self._size, DIM), dtype=np.float32)])
+                self._keys = np.concatenate([self._keys[:self._size], np.empty(capacity - self._size, dtype=np.int64)])
+            self._vectors[self._size:end] = vectors
+            self._keys[self._size:end] = key
+            self._stems.extend(stems)
+            self._sources.extend([source] * len(stems))
+            self._size = end
+
+    def sync(self, library):
+        """Add the question sets stored in ``library`` since the last sync"""
+        with self._lock:
+            after = self.synced_id
+        for item_id, title, data in library.question_sets(after_id=after):
+            self.add([q["stem"] for q in data["questions"]], item_id, title)
+            with self._lock:
+                self.synced_id = max(self.synced_id, item_id)
+
+    def nearest(self, vectors, before=None):
+        """Best match for each row of ``vectors`` (None if the index is empty), among keys below ``before``"""
+        with self._lock:
+            size, stored, keys = self._size, self._vectors, self._keys
+        if not size or not len(vectors):
+            return [None] * len(vectors)
+        scores = stored[:size] @ vectors.T
+        if before is not None:
+            scores[keys[:size] >= before] = -1.0
+        best = scores.argmax(axis=0)
+        return [Match(float(scores[b, i]), self._stems[b], self._sources[b]) if scores[b, i] > -1.0 else None
+                for i, b in enumerate(best)]
+
+
+def find_duplicates(stems, indexes=(), threshold=DUPLICATE_THRESHOLD):
+    """Positions in ``stems`` that repeat an earlier question, as ``{position: Match}``.
+
+    Earlier means anything in ``indexes`` (pairs of index and ``before`` key, see
+    ``QuestionIndex.nearest``) or a preceding stem in the same list.
+    """
+    vectors = embed(stems)
+    earlier = [index.nearest(vectors, before) for index, before in indexes]
+    within = vectors @ vectors.T
+    duplicates = {}
+    for i, stem in enumerate(stems):
+        candidates = [m[i] for m in earlier if m[i] is not None]
+        if i:
+            j = int(within[i, :i].argmax())
+            candidates.append(Match(float(within[i, j]), stems[j], "this set"))
+        best = max(candidates, key=lambda m: m.score, default=None)
+        if best is not None and best.score >= threshold:
+            duplicates[i] = best
+    return duplicates
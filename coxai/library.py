@@ -0,0 +1,158 @@
+"""SQLite library of generated question sets and rubrics with a full-text index.
+
+Every generation is stored with its inputs and validated JSON (see
+``coxai.structured``). An FTS5 index over titles (topic, level, type, scale) and
+bodies (question stems, rubric criteria and descriptors) backs faculty search.
+``find`` is consulted before generating: a request matches a stored item when it
+is the same kind, settings and topic words (ignoring case, order and filler
+words). A question request can also be served from a larger stored set.
+"""
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
+
+STOPWORDS = frozenset("a an and for in of on the to with".split())
+WORD = re.compile(r"\w+")
+
+
+@dataclass
+class LibraryItem:
+    id: int
+    kind: str
+    title: str
+    inputs: dict
+    data: dict
+    created: float
+    snippet: str = None
+    reused: bool = False
+
+
+def topic_key(text):
+    """Order- and case-insensitive topic words, so near-identical topics share a key"""
+    return " ".join(sorted({w for w in WORD.findall(text.casefold()) if w not in STOPWORDS}))
+
+
+def _questions_entry(inputs, data):
+    match_key = json.dumps([inputs["level"], inputs["q_type"], topic_key(inputs["topic"])])
+    title = f"{inputs['topic']} · {inputs['level']} · {inputs['q_type']}"
+    body = "\n".join(q["stem"] for q in data["questions"]) if data else ""
+    return match_key, inputs["num_questions"], title, body
+
+
+def _rubric_entry(inputs, data):
+    criteria = sorted({c.strip().casefold() for c in inputs["criteria"].split(",") if c.strip()})
+    match_key = json.dumps([inputs["scale"], criteria, topic_key(inputs["assignment"])])
+    title = f"{inputs['assignment']} · {inputs['scale']}"
+    body = "\n".join(f"{c['name']}: " + " ".join(d["description"] for d in c["descriptors"])
+                     for c in data["criteria"]) if data else ""
+    return match_key, len(criteria), title, body
+
+
+ENTRIES = {"questions": _questions_entry, "rubric": _rubric_entry}
+
+
+def fts_query(text):
+    """Quote each word (FTS5 syntax characters in user input are not operators) and prefix-match it"""
+    return " ".join(f'"{w}"*' for w in WORD.findall(text))
+
+
+class ContentLibrary:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS items ("
+                "id INTEGER PRIMARY KEY, kind TEXT NOT NULL, match_key TEXT NOT NULL, size INTEGER NOT NULL, "
+                "title TEXT NOT NULL, body TEXT NOT NULL, inputs TEXT NOT NULL, data TEXT NOT NULL, "
+                "created REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS items_match ON items (kind, match_key, size)")
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5("
+                "title, body, content='items', content_rowid='id', tokenize='porter unicode61')"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    @staticmethod
+    def _item(row, snippet=None):
+        item_id, kind, title, inputs, data, created = row
+        return LibraryItem(item_id, kind, title, json.loads(inputs), json.loads(data), created, snippet)
+
+    def add(self, kind, inputs, data):
+        match_key, size, title, body = ENTRIES[kind](inputs, data)
+        created = time.time()
+        with closing(self._connect()) as conn, conn:
+            item_id = conn.execute(
+                "INSERT INTO items (kind, match_key, size, title, body, inputs, data, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (kind, match_key, size, title, body, json.dumps(inputs), json.dumps(data), created)
+            ).lastrowid
+            conn.execute("INSERT INTO items_fts (rowid, title, body) VALUES (?, ?, ?)", (item_id, title, body))
+        return LibraryItem(item_id, kind, title, inputs, data, created)
+
+    def find(self, kind, inputs):
+        """Newest stored item for a near-identical request, or None"""
+        match_key, size, _, _ = ENTRIES[kind](inputs, None)
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT id, kind, title, inputs, data, created FROM items "
+                "WHERE kind = ? AND match_key = ? AND size >= ? ORDER BY size, created DESC LIMIT 1",
+                (kind, match_key, size)
+            ).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        item = self._item(row)
+        item.reused = True
+        if kind == "questions":
+            item.data = {"questions": item.data["questions"][:size]}
+        return item
+
+    def search(self, query="", kind=None, limit=20):
+        """Best full-text matches (title words weigh more), or the newest items for an empty query"""
+        match = fts_query(query)
+        where, params = ("AND items.kind = ?", [kind]) if kind else ("", [])
+        with closing(self._connect()) as conn:
+            if not match:
+                rows = conn.execute(
+                    f"SELECT id, kind, title, inputs, data, created, NULL FROM items "
+                    f"WHERE 1 {where} ORDER BY created DESC LIMIT ?", params + [limit]
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT items.id, items.kind, items.title, items.inputs, items.data, items.created, "
+                    "snippet(items_fts, 1, '**', '**', ' … ', 16) "
+                    f"FROM items_fts JOIN items ON items.id = items_fts.rowid WHERE items_fts MATCH ? {where} "
+                    "ORDER BY bm25(items_fts, 5.0, 1.0) LIMIT ?",
+                    [match] + params + [limit]
+                ).fetchall()
+        return [self._item(row[:6], row[6]) for row in rows]
+
+    def question_sets(self, after_id=0):
+        """(id, title, data) of every stored question set newer than ``after_id``, oldest first"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, title, data FROM items WHERE kind = 'questions' AND id > ? ORDER BY id", (after_id,)
+            ).fetchall()
+        return [(item_id, title, json.loads(data)) for item_id, title, data in rows]
+
+    def count(self):
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
@@ -0,0 +1,123 @@
+"""Bounded concurrency for LLM calls with a fair per-session wait queue.
+
+At most ``max_concurrent`` calls run at once; further callers wait in per-session
+FIFO queues that are served round-robin, so one session sending many messages
+cannot starve the others. Waiters can poll their queue position and give up
+after ``max_wait`` seconds. ``RateLimiter`` paces batch jobs to a requests-per-minute
+budget.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+class QueueTimeout(Exception):
+    """Raised when a caller waited longer than ``max_wait`` for a slot"""
+
+
+class Ticket:
+    __slots__ = ("session", "enqueued", "granted")
+
+    def __init__(self, session):
+        self.session = session
+        self.enqueued = time.monotonic()
+        self.granted = False
+
+
+class FairLimiter:
+    def __init__(self, max_concurrent=8, max_wait=60.0, poll_interval=0.1):
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+        self.active = 0
+        self._queues = OrderedDict()  # session -> deque of waiting tickets, in round-robin order
+        self._lock = threading.Lock()
+
+    def enter(self, session=None):
+        """Join the queue; the ticket is granted immediately when a slot is free"""
+        ticket = Ticket(session)
+        with self._lock:
+            self._queues.setdefault(session, deque()).append(ticket)
+            self._dispatch()
+        return ticket
+
+    def release(self, ticket):
+        """Free the ticket's slot, or leave the queue if it was never granted"""
+        with self._lock:
+            if ticket.granted:
+                ticket.granted = False
+                self.active -= 1
+            else:
+                queue = self._queues.get(ticket.session)
+                if queue is not None and ticket in queue:
+                    queue.remove(ticket)
+                    if not queue:
+                        del self._queues[ticket.session]
+            self._dispatch()
+
+    def _dispatch(self):
+        # Grant the head of the next session in rotation, then move that session to the back
+        while self.active < self.max_concurrent and self._queues:
+            session, queue = next(iter(self._queues.items()))
+            ticket = queue.popleft()
+            del self._queues[session]
+            if queue:
+                self._queues[session] = queue
+            ticket.granted = True
+            self.active += 1
+
+    def position(self, ticket):
+        """Number of waiting tickets that will be served before this one (0 once granted)"""
+        with self._lock:
+            queue = self._queues.get(ticket.session)
+            if ticket.granted or queue is None or ticket not in queue:
+                return 0
+            depth = queue.index(ticket)
+            ahead = 0
+            ours_seen = False
+            for session, other in self._queues.items():
+                if session == ticket.session:
+                    ahead += depth
+                    ours_seen = True
+                else:
+                    # Every session gets `depth` turns first; those ahead in rotation get one more
+                    ahead += min(len(other), depth + (not ours_seen))
+            return ahead
+
+    def waiting(self):
+        with self._lock:
+            return sum(len(q) for q in self._queues.values())
+
+    async def wait(self, ticket):
+        """Async generator yielding the queue position until the ticket is granted.
+
+        Raises QueueTimeout (after leaving the queue) once ``max_wait`` elapses.
+        """
+        last = None
+        while not ticket.granted:
+            if time.monotonic() - ticket.enqueued > self.max_wait:
+                self.release(ticket)
+                raise QueueTimeout(f"No slot free after {self.max_wait:g}s")
+            position = self.position(ticket)
+            if position != last:
+                last = position
+                yield position + 1
+            await asyncio.sleep(self.poll_interval)
+
+
+class RateLimiter:
+    """Spaces calls at least ``60 / per_minute`` seconds apart, across threads"""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
@@ -0,0 +1,75 @@
+"""Shared OpenAI clients backed by pooled keep-alive HTTP connections."""
+import threading
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+# One pool per process: TLS connections stay open between Streamlit reruns and Gradio events
+# SDK retries are off; coxai.resilience.ResilientCaller retries with a deadline and circuit breaker
+MAX_RETRIES = 0
+POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=120)
+TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+_clients = {}
+_async_clients = {}
+_lock = threading.Lock()
+
+
+class LazyClient:
+    """Stands in for an OpenAI client and builds it on first use.
+
+    With no key passed and OPENAI_API_KEY unset the SDK raises on construction;
+    deferring that to the first request lets the apps load and report the error
+    where they already handle failed requests.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return getattr(self._client, name)
+
+
+def get_client(api_key=None, base_url=None):
+    """Return the process-wide OpenAI client for this key/endpoint, creating it once.
+
+    This module is imported once per process (Streamlit only re-executes the page
+    script), so the client and its connection pool survive reruns. An empty
+    placeholder key falls back to the OPENAI_API_KEY environment variable.
+    """
+    api_key = api_key or None
+    key = (api_key, base_url)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = LazyClient(lambda: OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                max_retries=MAX_RETRIES,
+                http_client=httpx.Client(limits=POOL_LIMITS, timeout=TIMEOUT)
+            ))
+            _clients[key] = client
+        return client
+
+
+def get_async_client(api_key=None, base_url=None):
+    """Return the process-wide AsyncOpenAI client (for async Gradio handlers)"""
+    api_key = api_key or None
+    key = (api_key, base_url)
+    with _lock:
+        client = _async_clients.get(key)
+        if client is None:
+            client = LazyClient(lambda: AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                max_retries=MAX_RETRIES,
+                http_client=httpx.AsyncClient(limits=POOL_LIMITS, timeout=TIMEOUT)
+            ))
+            _async_clients[key] = client
+        return client
@@ -0,0 +1,125 @@
+"""Vectorized Monte Carlo schedule simulation for the Delta Wind Farm network."""
+from dataclasses import dataclass
+
+import numpy as np
+
+from coxai.project import DEADLINE_DAYS, DELTA_WIND_FARM, GATE_DAYS, REWORK_DAYS, REWORK_PROB
+
+NETWORK = DELTA_WIND_FARM
+CODES = NETWORK.codes
+INDEX = NETWORK.index
+A6, A8 = INDEX["A6"], INDEX["A8"]
+
+# Resolution of the per-activity inverse-CDF tables used for sampling
+QUANTILE_POINTS = 2049
+
+
+def pert_quantile_table(estimates, points=QUANTILE_POINTS):
+    """Tabulate the inverse CDF of each activity's PERT-beta distribution.
+
+    `estimates` is an (n_activities, 3) array of optimistic / most likely /
+    pessimistic days. Sampling by table lookup of uniform draws is several times
+    faster than calling the beta sampler, and the tables are built once at import.
+    """
+    a, m, b = estimates.T
+    span = b - a
+    alpha = 1 + 4 * (m - a) / span
+    beta = 1 + 4 * (b - m) / span
+    x = np.linspace(0.0, 1.0, 8 * points)
+    pdf = x[None, :] ** (alpha[:, None] - 1) * (1 - x[None, :]) ** (beta[:, None] - 1)
+    cdf = np.concatenate([np.zeros((len(a), 1)), np.cumsum((pdf[:, 1:] + pdf[:, :-1]) / 2, axis=1)], axis=1)
+    cdf /= cdf[:, -1:]
+    u = np.linspace(0.0, 1.0, points)
+    table = np.stack([np.interp(u, cdf[i], x) for i in range(len(a))])
+    return (a[:, None] + span[:, None] * table).astype(np.float32)
+
+
+QUANTILES = pert_quantile_table(NETWORK.estimates)
+
+
+def sample_durations(rng, n_trials):
+    """Sample an (n_activities, n_trials) array of PERT-beta durations"""
+    points = QUANTILES.shape[1]
+    pos = rng.random((len(CODES), n_trials), dtype=np.float32) * np.float32(points - 1)
+    idx = np.minimum(pos.astype(np.int32), points - 2)
+    frac = pos - idx
+    rows = np.arange(len(CODES))[:, None]
+    lo = QUANTILES[rows, idx]
+    return lo + frac * (QUANTILES[rows, idx + 1] - lo)
+
+
+def propagate(durations, rework, gate):
+    """Forward-pass every trial through the network at once; returns project finish days.
+
+    `durations` is (n_activities, n_trials); `rework` and `gate` are per-trial extra
+    days added to A8 and to the start of offshore assembly (A6, and therefore A8).
+    """
+    finish = np.empty_like(durations)
+    for i in NETWORK.topo_order:
+        preds = NETWORK.predecessors[i]
+        if not preds:
+            start = 0.0
+        elif len(preds) == 1:
+            start = finish[preds[0]]
+        else:
+            start = np.maximum.reduce([finish[p] for p in preds])
+        duration = durations[i]
+        if i == A6:
+            start = start + gate
+        elif i == A8:
+            duration = duration + rework
+        np.add(start, duration, out=finish[i])
+    # The project ends when every sink (A7 and A12) is done
+    return np.maximum.reduce([finish[i] for i in NETWORK.sinks])
+
+
+def sample_risks(rng, n_trials, rework_prob=REWORK_PROB, gate_halt_prob=0.0):
+    """Sample per-trial rework and regulatory-halt delays in days"""
+    rework = (rng.random(n_trials) < rework_prob).astype(np.float32) * REWORK_DAYS
+    gate = (rng.random(n_trials) < gate_halt_prob).astype(np.float32) * GATE_DAYS
+    return rework, gate
+
+
+@dataclass
+class SimulationResult:
+    finish_days: np.ndarray
+    deadline_days: float
+
+    @property
+    def p_on_time(self):
+        return float(np.mean(self.finish_days <= self.deadline_days))
+
+    @property
+    def mean(self):
+        return float(self.finish_days.mean())
+
+    def percentile(self, q):
+        return float(np.percentile(self.finish_days, q))
+
+    def summary(self):
+        p10, p50, p90 = np.percentile(self.finish_days, [10, 50, 90])
+        return {
+            "trials": int(self.finish_days.size),
+            "mean_days": self.mean,
+            "p10_days": float(p10),
+            "p50_days": float(p50),
+            "p90_days": float(p90),
+            "p_on_time": self.p_on_time,
+        }
+
+
+def simulate(n_trials=1_000_000, seed=None, rework_prob=REWORK_PROB, gate_halt_prob=0.0,
+             deadline_days=DEADLINE_DAYS, batch_size=250_000):
+    """Simulate project completion for `n_trials` trials, processed in fixed-size batches.
+
+    `gate_halt_prob` is the chance the regulatory paperwork is not cleared before
+    offshore work (0 when it is handled in parallel with A1/A2).
+    """
+    rng = np.random.default_rng(seed)
+    finish = np.empty(n_trials, dtype=np.float32)
+    for lo in range(0, n_trials, batch_size):
+        n = min(batch_size, n_trials - lo)
+        durations = sample_durations(rng, n)
+        rework, gate = sample_risks(rng, n, rework_prob, gate_halt_prob)
+        finish[lo:lo + n] = propagate(durations, rework, gate)
+    return SimulationResult(finish, deadline_days)
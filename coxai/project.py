@@ -0,0 +1,263 @@
+"""Structured Delta Wind Farm project network shared by the bots and schedule tools."""
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+DEADLINE = "June 30"
+# ASSUMPTION, not case data: the case fixes June 30 but not the kickoff date, so the
+# day count from kickoff to the deadline is a default the UI labels and lets users change
+DEADLINE_DAYS = int(os.environ.get("DEADLINE_DAYS", 75))
+# The total the case states; its activity rows add up to more, but every brief and prompt quotes this one
+BASELINE_COST_K = 4090
+CONTINGENCY = 400_000
+DELAY_PENALTY_PER_DAY = 3_000
+
+# A6-A8 coupling: 30% chance of a rework loop adding 4 days to A8
+REWORK_PROB = 0.30
+REWORK_DAYS = 4.0
+# Regulatory paperwork gate: a 5-day halt before A6/A8 if not cleared in time
+GATE_DAYS = 5.0
+# Onshore long pole, constrained by concrete batch capacity
+BOTTLENECK = "A3"
+
+
+@dataclass(frozen=True, slots=True)
+class Activity:
+    code: str
+    name: str
+    short_name: str
+    site: str
+    description: str
+    optimistic: float
+    most_likely: float
+    pessimistic: float
+    cost_k: int
+    owner: str = None
+
+    @property
+    def pert_mean(self):
+        return (self.optimistic + 4 * self.most_likely + self.pessimistic) / 6
+
+    @property
+    def pert_variance(self):
+        return ((self.pessimistic - self.optimistic) / 6) ** 2
+
+    @property
+    def three_point(self):
+        return f"{self.optimistic:g}/{self.most_likely:g}/{self.pessimistic:g}"
+
+
+@dataclass(frozen=True, slots=True)
+class CrashOption:
+    code: str
+    activity: str
+    label: str
+    days_saved: float
+    cost_k: int
+    rationale: str
+
+
+@dataclass(frozen=True, slots=True)
+class Dependency:
+    predecessors: tuple
+    successor: str
+    note: str = ""
+
+
+ACTIVITIES = (
+    Activity("A1", "Access road and grading", "Access", "Onshore", "Prepare land routes, drainage", 6, 8, 12, 120, "sam"),
+    Activity("A2", "Offshore platform prep", "Platform", "Offshore", "Dredging, seabed stabilization", 7, 9, 13, 180, "maya"),
+    Activity("A3", "Foundation fabrication", "Foundation", "Onshore", "Pour concrete, embed rebar", 10, 12, 16, 420, "sam"),
+    Activity("A4", "Foundation installation", "Install", "Offshore", "Transport and mount foundations", 9, 11, 14, 560, "maya"),
+    Activity("A5", "Turbine shipment and staging", "Ship", "Onshore", "Receive/inspect components", 6, 8, 10, 260, "rita"),
+    Activity("A6", "Tower assembly", "Tower", "Offshore", "Erect towers using barge cranes", 8, 10, 15, 700, "maya"),
+    Activity("A7", "Nacelle and blade installation", "Nacelle", "Offshore", "Mount nacelles and blades", 7, 9, 12, 520, "maya"),
+    Activity("A8", "Subsea cabling", "Cable", "Offshore", "Lay/bury array cables; pull-ins", 10, 13, 18, 840, "maya"),
+    Activity("A9", "Onshore grid substation", "Substation", "Onshore", "Build substation, protection", 8, 10, 13, 640, "sam"),
+    Activity("A10", "System integration and testing", "Integration", "Both", "Synchronize systems", 6, 8, 11, 300),
+    Activity("A11", "Environmental and safety inspection", "Inspection", "Both", "OSHA/Coast Guard clearance", 5, 6, 9, 160, "carlos"),
+    Activity("A12", "Investor report and media release", "Handover", "Onshore", "Final report; announcement", 3, 4, 6, 90),
+)
+
+DEPENDENCIES = (
+    Dependency(("A1",), "A3", "access/yard readiness precedes fabrication"),
+    Dependency(("A2", "A3"), "A4", "need fabricated bases and prepped seabed"),
+    Dependency(("A4", "A5"), "A6", "installed foundations + staged components gate tower assembly"),
+    Dependency(("A6",), "A7", "towers before nacelle/blades"),
+    Dependency(("A6",), "A8", "start A8 after first towers for as-built data"),
+    Dependency(("A8", "A9"), "A10", "both cables and substation must exist to integrate"),
+    Dependency(("A10",), "A11", "test before inspection"),
+    Dependency(("A11",), "A12", "inspect, then report/launch"),
+)
+
+CRASH_OPTIONS = (
+    CrashOption("S1", "A3", "Foundation", 3, 70, "Add second batch team; coordination risk"),
+    CrashOption("S2", "A5", "Staging", 4, 110, "Charter faster feeder; unlocks A6 earlier"),
+    CrashOption("S3", "A6", "Towers", 5, 150, "Second crane crew + barge; QA holds advised"),
+    CrashOption("S4", "A8", "Cabling", 4, 130, "ROV-assisted lay; weather-sensitive"),
+    CrashOption("S5", "A9", "Substation", 3, 60, "Overtime electrical crew; manageable"),
+)
+
+KEY_RISKS = (
+    f"A6-A8 coupling: {REWORK_PROB:.0%} probability of +{REWORK_DAYS:g} days rework if tower tolerances are off",
+    f"Regulatory paperwork gate: +{GATE_DAYS:g} days halt if not cleared before A6/A8",
+    "Weather windows: 10-15% variability for offshore work",
+    "Customs risk (A5): documentation errors can add 1-2 days",
+)
+
+
+class ProjectNetwork:
+    """Activities indexed by position, with array-backed adjacency and a fixed topological order"""
+
+    __slots__ = ("activities", "dependencies", "crash_options", "codes", "index", "predecessors",
+                 "successors", "topo_order", "sinks", "estimates", "crash_by_code")
+
+    def __init__(self, activities, dependencies, crash_options):
+        self.activities = tuple(activities)
+        self.dependencies = tuple(dependencies)
+        self.crash_options = tuple(crash_options)
+        self.codes = tuple(a.code for a in self.activities)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.crash_by_code = {c.code: c for c in self.crash_options}
+
+        preds = [[] for _ in self.activities]
+        succs = [[] for _ in self.activities]
+        for dep in self.dependencies:
+            j = self.index[dep.successor]
+            for code in dep.predecessors:
+                i = self.index[code]
+                preds[j].append(i)
+                succs[i].append(j)
+        self.predecessors = tuple(tuple(p) for p in preds)
+        self.successors = tuple(tuple(s) for s in succs)
+        self.sinks = tuple(i for i, s in enumerate(self.successors) if not s)
+        self.topo_order = self._topological_order()
+        # (n_activities, 3) optimistic / most likely / pessimistic
+        self.estimates = np.array(
+            [(a.optimistic, a.most_likely, a.pessimistic) for a in self.activities], dtype=np.float64
+        )
+
+    def _topological_order(self):
+        indegree = [len(p) for p in self.predecessors]
+        ready = [i for i, d in enumerate(indegree) if d == 0]
+        order = []
+        while ready:
+            i = ready.pop(0)
+            order.append(i)
+            for j in self.successors[i]:
+                indegree[j] -= 1
+                if indegree[j] == 0:
+                    ready.append(j)
+        if len(order) != len(self.activities):
+            raise ValueError("Project network contains a cycle")
+        return tuple(order)
+
+    def __getitem__(self, code):
+        return self.activities[self.index[code]]
+
+    def crash(self, code):
+        return self.crash_by_code[code]
+
+    # --- Prompt and panel rendering -------------------------------------------------
+
+    def expertise_line(self, code, note=""):
+        a = self[code]
+        line = f"{a.code}: {a.name} ({a.most_likely:g} days most likely, {a.optimistic:g} best, {a.pessimistic:g} worst)"
+        return f"{line} - {note}" if note else line
+
+    def brief(self, code, note=""):
+        a = self[code]
+        return f"{a.code}({a.three_point}d{'-' + note if note else ''})"
+
+    def crash_brief(self, code):
+        c = self.crash(code)
+        return f"{c.activity}(-{c.days_saved:g}d,${c.cost_k}k)"
+
+    def crash_lines(self):
+        return [f"**{c.code}:** {c.activity} {c.label} (-{c.days_saved:g}d, ${c.cost_k}k)" for c in self.crash_options]
+
+    def dependency_lines(self):
+        lines = []
+        for dep in self.dependencies:
+            lines.append(f"{' & '.join(dep.predecessors)} → {dep.successor}")
+            if dep.successor == "A8":
+                lines.append("**A6 ↔ A8 (coupling risk!)**")
+        return lines
+
+
+DELTA_WIND_FARM = ProjectNetwork(ACTIVITIES, DEPENDENCIES, CRASH_OPTIONS)
+
+
+def case_study_context(network=DELTA_WIND_FARM):
+    """Render the full case-study knowledge base used by the Gradio agents"""
+    rows = "\n".join(
+        f"| {a.code} | {a.name} | {a.site} | {a.description} | {a.most_likely:g} | {a.optimistic:g} | {a.pessimistic:g} |"
+        for a in network.activities
+    )
+    deps = "\n".join(
+        f"- {' and '.join(d.predecessors)} then {d.successor} ({d.note})" for d in network.dependencies
+    )
+    costs = "\n".join(f"| {a.code} | {a.cost_k} |" for a in network.activities)
+    crashes = "\n".join(
+        f"| {c.code} | {c.activity} ({c.label.lower()}) | {c.days_saved:g} days | ${c.cost_k}k | {c.rationale} |"
+        for c in network.crash_options
+    )
+    risks = "\n".join(f"{i}. {r}" for i, r in enumerate(KEY_RISKS, 1))
+    return f"""
+# Delta Wind Farm Project - Case Study Context
+
+## Project Overview
+- Phase II expansion: 50 turbines with onshore fabrication and offshore installation
+- Hard deadline: {DEADLINE} (tied to Series B investor covenant)
+- Missing deadline triggers financing freeze and reputational damage
+- Project Manager: Sarah Chen
+
+## Activities ({len(network.activities)} Total)
+| Code | Activity | Site | Description | Most-Likely (days) | Best | Worst |
+|------|----------|------|-------------|-------------------|------|-------|
+{rows}
+
+## Dependencies (Network Logic)
+{deps}
+- **Coupling Risk: A6 and A8 are coupled**: {REWORK_PROB:.0%} chance of rework loop adding +{REWORK_DAYS:g} days to A8
+- Regulatory paperwork gate: must be approved before A6/A8 commence; otherwise +{GATE_DAYS:g} days halt
+
+## Baseline Costs
+| Activity | Cost (USD thousands) |
+|----------|----------------|
+{costs}
+| **Total** | **{BASELINE_COST_K:,}** |
+
+## Financial Constraints
+- Contingency available: ${CONTINGENCY:,}
+- Delay burn: ${DELAY_PENALTY_PER_DAY:,}/day beyond {DEADLINE}
+- Early completion: No savings (resources pre-contracted)
+- CEO Policy: Only ONE acceleration option allowed
+
+## Crash (Acceleration) Options
+| Option | Activity | Time Saved | Cost | Rationale/Risk |
+|--------|----------|------------|------|----------------|
+{crashes}
+
+## Key Risks
+{risks}
+"""
+
+
+def case_study_brief(network=DELTA_WIND_FARM):
+    """Render the compact one-screen case summary used by Department_Bot"""
+    acts = " | ".join(
+        f"{a.code} {a.short_name}:{a.three_point}" + (f"({a.owner.capitalize()}{',BOTTLENECK' if a.code == BOTTLENECK else ''})" if a.owner else "")
+        for a in network.activities
+    )
+    deps = ", ".join(f"{'&'.join(d.predecessors)}→{d.successor}" for d in network.dependencies)
+    crashes = " | ".join(f"{c.code}:{c.activity}-{c.days_saved:g}d${c.cost_k}k" for c in network.crash_options)
+    return f"""DELTA WIND FARM - PHASE II: 50 turbines, {DEADLINE} HARD deadline (investor covenant)
+Budget: ${BASELINE_COST_K / 1000:.2f}M + ${CONTINGENCY // 1000}k contingency | Delay: ${DELAY_PENALTY_PER_DAY // 1000}k/day | NO early savings
+
+ACTIVITIES (O/M/P days): {acts}
+
+DEPS: {deps}
+RISKS: A6↔A8 coupling ({REWORK_PROB:.0%} rework +{REWORK_DAYS:g}d) | Regulatory gate (+{GATE_DAYS:g}d halt if not cleared before A6/A8)
+CRASH (ONE only): {crashes}"""
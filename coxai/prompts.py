@@ -0,0 +1,46 @@
+"""Prompt layout for provider-side prompt caching.
+
+OpenAI caches the longest previously seen prompt prefix (in 128-token steps once
+it reaches 1,024 tokens) and bills those input tokens at a discount. To benefit,
+every request must start with the same bytes: the shared case context goes
+first and identical for all agents, role-specific text after it, then the
+conversation. ``prefix_report`` shows how much of a set of prompts is shared.
+"""
+import os
+
+from .context import count_tokens
+
+# Provider minimum before any prefix is cached
+MIN_CACHEABLE_TOKENS = 1024
+ROLE_HEADER = "# Your Role"
+
+
+def layout_system_prompt(shared, role):
+    """Shared block first and byte-identical for every agent, then the role-specific part"""
+    return f"{shared.strip()}\n\n{ROLE_HEADER}\n{role.strip()}"
+
+
+def common_prefix(texts):
+    return os.path.commonprefix(list(texts))
+
+
+def prefix_report(prompts, min_tokens=MIN_CACHEABLE_TOKENS):
+    """Token counts for a dict of name -> system prompt and the prefix they all share"""
+    shared = common_prefix(prompts.values())
+    shared_tokens = count_tokens(shared)
+    return {
+        "shared_tokens": shared_tokens,
+        "cacheable": shared_tokens >= min_tokens,
+        "prompt_tokens": {name: count_tokens(text) for name, text in prompts.items()},
+    }
+
+
+def format_prefix_report(report):
+    lines = [
+        f"shared prefix: {report['shared_tokens']} tokens "
+        f"({'cacheable' if report['cacheable'] else f'below the {MIN_CACHEABLE_TOKENS}-token caching minimum'})"
+    ]
+    for name, tokens in report["prompt_tokens"].items():
+        share = report["shared_tokens"] / tokens if tokens else 0.0
+        lines.append(f"  {name:<10}{tokens:>6} tokens, {share:.0%} shared")
+    return "\n".join(lines)
@@ -0,0 +1,201 @@
+"""Retries with jittered backoff and a circuit breaker for OpenAI calls.
+
+Rate limits (429), server errors (5xx), timeouts and connection failures are
+retried with full-jitter exponential backoff, honoring ``Retry-After`` when the
+API sends it, within an overall deadline so tail latency stays bounded. Sustained
+failures open a circuit breaker that fails fast until a probe call succeeds.
+Callers catch ``LLMUnavailable`` and fall back to a cached or canned reply.
+"""
+import asyncio
+import random
+import threading
+import time
+
+import httpx
+import openai
+
+
+class LLMUnavailable(Exception):
+    """The call failed after retries, or the circuit breaker is open"""
+
+
+class CircuitOpen(LLMUnavailable):
+    pass
+
+
+def is_retryable(exc):
+    if isinstance(exc, (openai.APIConnectionError, httpx.TimeoutException, httpx.TransportError)):
+        return True  # includes openai.APITimeoutError
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code in (408, 409, 429) or exc.status_code >= 500
+    return False
+
+
+def retry_after(exc):
+    """Seconds the server asked us to wait, from Retry-After(-Ms) headers, or None"""
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        return None  # HTTP-date form; fall back to our own backoff
+    return None
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failed calls; after `reset_timeout`
+    seconds a single probe call is let through (half-open) to test recovery.
+
+    ``allow`` is asked once per call, not per attempt: the probe's own retries must
+    not be refused by the probe it is running. ``clock`` is injectable for tests.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if self.clock() - self.opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.clock() - self.opened_at < self.reset_timeout or self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def abandon(self):
+        """A call ended without a verdict; let the next call probe again"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+            self._probing = False
+
+
+class ResilientCaller:
+    """Wraps a completion call with retries, a deadline and a shared circuit breaker.
+
+    Each attempt gets ``timeout=min(attempt_timeout, time left)``, so the whole
+    call, including backoff sleeps, finishes within ``deadline`` seconds.
+    """
+
+    def __init__(self, max_attempts=4, base_delay=0.5, max_delay=8.0, deadline=25.0, attempt_timeout=20.0,
+                 breaker=None, rng=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.rng = rng or random.Random()
+
+    def _backoff(self, attempt, exc):
+        hinted = retry_after(exc)
+        if hinted is not None:
+            return hinted
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _next_delay(self, attempt, exc, started):
+        """Delay before the next attempt, or raise LLMUnavailable if we should stop"""
+        remaining = self.deadline - (time.monotonic() - started)
+        delay = self._backoff(attempt, exc)
+        if attempt + 1 >= self.max_attempts or delay >= remaining:
+            # Only calls that exhaust their retries count toward the breaker, not single 429s
+            self.breaker.record_failure()
+            raise LLMUnavailable(f"{type(exc).__name__} after {attempt + 1} attempt(s)") from exc
+        return delay
+
+    def _attempt_kwargs(self, kwargs, started):
+        remaining = self.deadline - (time.monotonic() - started)
+        return dict(kwargs, timeout=max(0.1, min(self.attempt_timeout, remaining)))
+
+    def call(self, fn, *args, **kwargs):
+        if not self.breaker.allow():
+            raise CircuitOpen("OpenAI circuit breaker is open")
+        started = time.monotonic()
+        settled = False  # the breaker has been told how this call ended
+        try:
+            for attempt in range(self.max_attempts):
+                try:
+                    result = fn(*args, **self._attempt_kwargs(kwargs, started))
+                except Exception as e:
+                    if not is_retryable(e):
+                        # The API answered (e.g. a 400), so it is up; don't leave a probe hanging
+                        self.breaker.record_success()
+                        settled = True
+                        raise
+                    try:
+                        delay = self._next_delay(attempt, e, started)
+                    except LLMUnavailable:
+                        settled = True
+                        raise
+                    time.sleep(delay)
+                    continue
+                self.breaker.record_success()
+                settled = True
+                return result
+        finally:
+            if not settled:
+                # Cancelled or interrupted (e.g. a Streamlit rerun) mid-call: no verdict on the API,
+                # but a probe must not stay in flight forever
+                self.breaker.abandon()
+
+    async def acall(self, fn, *args, **kwargs):
+        if not self.breaker.allow():
+            raise CircuitOpen("OpenAI circuit breaker is open")
+        started = time.monotonic()
+        settled = False  # the breaker has been told how this call ended
+        try:
+            for attempt in range(self.max_attempts):
+                try:
+                    result = await fn(*args, **self._attempt_kwargs(kwargs, started))
+                except Exception as e:
+                    if not is_retryable(e):
+                        # The API answered (e.g. a 400), so it is up; don't leave a probe hanging
+                        self.breaker.record_success()
+                        settled = True
+                        raise
+                    try:
+                        delay = self._next_delay(attempt, e, started)
+                    except LLMUnavailable:
+                        settled = True
+                        raise
+                    await asyncio.sleep(delay)
+                    continue
+                self.breaker.record_success()
+                settled = True
+                return result
+        finally:
+            if not settled:
+                # Cancelled or interrupted (e.g. a Streamlit rerun) mid-call: no verdict on the API,
+                # but a probe must not stay in flight forever
+                self.breaker.abandon()
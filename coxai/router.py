@@ -0,0 +1,108 @@
+"""Route each student message to a cheap or premium model with a local classifier.
+
+Greetings, small talk and simple factual questions go to the fast model;
+quantitative schedule work (critical path, PERT, probabilities, comparing,
+recommending or deciding on crash options, what-if slips) goes to the stronger one. Only explicitly
+analytical terms reach the threshold on their own, so the premium model, and the
+model switch that forfeits the prompt cache, stay the exception. The classifier
+is a weighted keyword/feature score, so routing adds no latency and no API call.
+"""
+import os
+import re
+from dataclasses import dataclass
+
+SIMPLE = "simple"
+ANALYSIS = "analysis"
+
+DEFAULT_MODELS = {
+    SIMPLE: os.environ.get("ROUTER_SIMPLE_MODEL", "gpt-4o-mini"),
+    ANALYSIS: os.environ.get("ROUTER_ANALYSIS_MODEL", "gpt-4o"),
+}
+
+# Each of these alone asks for multi-step reasoning and meets the default threshold
+ANALYSIS_TERMS = (
+    "critical path", "slack", "pert", "variance", "standard deviation", "probability", "monte carlo",
+    "expected value", "expected duration", "expected completion", "calculate", "compute", "compare",
+    "trade-off", "tradeoff", "which option", "best option", "recommend", "what if", "should we", "worth it",
+)
+# Crash decisions and what-ifs phrased without those words
+ANALYSIS_PATTERNS = (
+    re.compile(r"\bS\d{1,2}\s+or\s+S\d{1,2}\b", re.IGNORECASE),  # "S3 or S4?"
+    re.compile(r"\bslip(s|ped|ping)?\b", re.IGNORECASE),
+    re.compile(r"\bwhat happens\b.*\bif\b", re.IGNORECASE),
+)
+# Topic words that only add weight: "how much does S3 cost?" is still a lookup
+CONTEXT_TERMS = (
+    "crash", "exposure", "penalty", "rework", "coupling", "bottleneck", "worth", "delay", "deadline",
+    "finish date", "completion",
+)
+ANALYSIS_WEIGHT = 1.5
+CONTEXT_WEIGHT = 0.5
+SIMPLE_PATTERNS = re.compile(
+    r"^\s*(hi|hello|hey|thanks|thank you|ok|okay|great|got it|nice to meet|good (morning|afternoon))\b"
+    r"|\bwho are you\b|\bwhat do you do\b|\byour role\b",
+    re.IGNORECASE,
+)
+FOLLOW_UP = re.compile(
+    r"^\s*(why\b|how so|how come|can you elaborate|elaborate|go on|tell me more|what do you mean|can you explain that)",
+    re.IGNORECASE,
+)
+CODES = re.compile(r"\b[AS]\d{1,2}\b")
+NUMBERS = re.compile(r"\$?\d[\d,.]*\s*(k|m|%|days?|weeks?)?\b", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class Route:
+    name: str
+    model: str
+    score: float
+
+
+def analysis_score(message):
+    """Higher means more likely to need multi-step quantitative reasoning.
+
+    An activity or crash code, a number or a topic word alone stays well below the
+    threshold, so plain lookups ("what is A8's duration?") stay on the fast model.
+    """
+    text = message.casefold()
+    score = sum(ANALYSIS_WEIGHT for term in ANALYSIS_TERMS if term in text)
+    score += sum(ANALYSIS_WEIGHT for pattern in ANALYSIS_PATTERNS if pattern.search(message))
+    score += sum(CONTEXT_WEIGHT for term in CONTEXT_TERMS if term in text)
+    codes = CODES.findall(message)
+    score += min(0.5, 0.25 * len(set(codes)))
+    score += min(0.5, 0.25 * len(NUMBERS.findall(CODES.sub(" ", message))))
+    if len(text.split()) > 25:
+        score += 0.5
+    if SIMPLE_PATTERNS.search(message) and len(text.split()) <= 8:
+        score -= 2.0
+    return score
+
+
+class ModelRouter:
+    """Classify a message and pick the model for its route.
+
+    Short follow-ups ("why?", "can you elaborate?") inherit the route of the
+    previous student message so an analysis thread stays on the premium model.
+    """
+
+    def __init__(self, models=None, threshold=1.5):
+        self.models = dict(DEFAULT_MODELS, **(models or {}))
+        self.threshold = threshold
+
+    def classify(self, message, previous=None):
+        score = analysis_score(message)
+        if previous and FOLLOW_UP.search(message) and len(message.split()) <= 8:
+            score = max(score, analysis_score(previous))
+        return (ANALYSIS if score >= self.threshold else SIMPLE), score
+
+    def route(self, message, previous=None):
+        name, score = self.classify(message, previous)
+        return Route(name, self.models[name], score)
+
+
+def last_user_message(history, role_key="role", text_key="content"):
+    """Most recent student message in a history list, for follow-up routing"""
+    for message in reversed(history):
+        if message[role_key] == "user":
+            return message[text_key]
+    return None
@@ -0,0 +1,178 @@
+"""Structured JSON output for generated question sets and rubrics.
+
+Requests use OpenAI structured outputs (``response_format`` json_schema, strict).
+The schema is built per request, so it pins the number of questions, four
+lettered options per multiple-choice question, and the rubric's criteria and
+levels. Replies are re-validated locally: strict mode can still return truncated
+JSON, and some rules can't be written as a schema (distinct options, one
+descriptor per level). A reply that fails gets a single repair turn listing the
+errors; if that still fails, ``StructuredOutputError`` is raised.
+"""
+import json
+import re
+from functools import lru_cache
+
+from jsonschema import Draft202012Validator
+
+OPTION_LETTERS = ("A", "B", "C", "D")
+SCALE_LEVELS = {
+    "Excellent / Good / Fair / Poor": ("Excellent", "Good", "Fair", "Poor"),
+    "4-point scale": ("4", "3", "2", "1"),
+    "Percentage-based": ("90-100%", "80-89%", "70-79%", "Below 70%"),
+}
+REPAIR_PROMPT = """Your reply did not match the required JSON format:
+{errors}
+
+Return the complete corrected JSON object only."""
+
+
+class StructuredOutputError(ValueError):
+    """The model's reply was still invalid after the repair turn"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"Invalid structured output: {'; '.join(errors[:3])}")
+
+
+def _object(properties):
+    return {"type": "object", "properties": properties, "required": list(properties), "additionalProperties": False}
+
+
+def _array(items, count=None):
+    schema = {"type": "array", "items": items}
+    if count is not None:
+        schema.update(minItems=count, maxItems=count)
+    return schema
+
+
+def question_set_schema(q_type, num_questions):
+    if q_type == "Multiple Choice":
+        item = _object({
+            "stem": {"type": "string"},
+            "options": _array({"type": "string"}, len(OPTION_LETTERS)),
+            "answer": {"type": "string", "enum": list(OPTION_LETTERS)},
+            "explanation": {"type": "string"},
+        })
+    else:
+        # Short-answer and essay items carry a model answer / grading notes instead of options
+        item = _object({"stem": {"type": "string"}, "answer": {"type": "string"}, "explanation": {"type": "string"}})
+    return _object({"questions": _array(item, num_questions)})
+
+
+def criteria_names(criteria):
+    return list(dict.fromkeys(c.strip() for c in criteria.split(",") if c.strip()))
+
+
+def rubric_schema(criteria, scale):
+    names = criteria_names(criteria)
+    levels = SCALE_LEVELS.get(scale)
+    level = {"type": "string", "enum": list(levels)} if levels else {"type": "string"}
+    criterion = _object({
+        "name": {"type": "string", "enum": names} if names else {"type": "string"},
+        "descriptors": _array(_object({"level": level, "description": {"type": "string"}}),
+                              len(levels) if levels else None),
+    })
+    return _object({
+        "levels": _array(level, len(levels) if levels else None),
+        "criteria": _array(criterion, len(names) or None),
+    })
+
+
+def response_format(name, schema):
+    return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema}}
+
+
+@lru_cache(maxsize=64)
+def _validator(schema_json):
+    # Schemas are rebuilt per request; compile each distinct one once
+    return Draft202012Validator(json.loads(schema_json))
+
+
+def schema_errors(data, schema):
+    validator = _validator(json.dumps(schema, sort_keys=True))
+    return [f"{e.json_path}: {e.message}" for e in validator.iter_errors(data)]
+
+
+def question_set_errors(data):
+    errors = []
+    for i, q in enumerate(data["questions"], start=1):
+        if not q["stem"].strip():
+            errors.append(f"question {i}: the stem is empty")
+        options = [re.sub(r"^[A-D][.)]\s*", "", o.strip()).casefold() for o in q.get("options", [])]
+        if len(set(options)) != len(options):
+            errors.append(f"question {i}: options must be distinct")
+    return errors
+
+
+def rubric_errors(data):
+    errors = []
+    names = [c["name"].casefold() for c in data["criteria"]]
+    if len(set(names)) != len(names):
+        errors.append("each criterion must appear once")
+    if len(set(data["levels"])) != len(data["levels"]):
+        errors.append("levels must be distinct")
+    for c in data["criteria"]:
+        if [d["level"] for d in c["descriptors"]] != data["levels"]:
+            errors.append(f"criterion {c['name']!r}: give one descriptor per level, in the order of 'levels'")
+    return errors
+
+
+def validate(text, schema, check=None):
+    """Parse and validate a reply; returns (data, errors) with data None if it isn't JSON"""
+    try:
+        data = json.loads(text)
+    except (TypeError, json.JSONDecodeError) as e:
+        return None, [f"the reply is not valid JSON ({e})"]
+    errors = schema_errors(data, schema)
+    if not errors and check is not None:
+        errors = check(data)
+    return data, errors
+
+
+def generate_structured(complete, prompt, name, schema, check=None):
+    """Run ``complete(messages, response_format) -> reply text`` with one repair turn on invalid output"""
+    messages = [{"role": "user", "content": prompt}]
+    fmt = response_format(name, schema)
+    text = complete(messages, fmt)
+    data, errors = validate(text, schema, check)
+    if not errors:
+        return data
+    messages += [
+        {"role": "assistant", "content": text or ""},
+        {"role": "user", "content": REPAIR_PROMPT.format(errors="\n".join(f"- {e}" for e in errors[:20]))},
+    ]
+    text = complete(messages, fmt)
+    data, errors = validate(text, schema, check)
+    if errors:
+        raise StructuredOutputError(errors)
+    return data
+
+
+def render_question_set(data):
+    lines = []
+    for i, q in enumerate(data["questions"], start=1):
+        lines.append(f"**{i}. {q['stem']}**")
+        if "options" in q:
+            lines.append("")
+            lines.extend(f"- {letter}. {option}" for letter, option in zip(OPTION_LETTERS, q["options"]))
+            lines.append(f"\n*Answer:* {q['answer']}. {q['explanation']}")
+        else:
+            lines.append(f"\n*Model answer:* {q['answer']}")
+            if q["explanation"]:
+                lines.append(f"\n*Grading notes:* {q['explanation']}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def render_rubric(data):
+    def cell(text):
+        return " ".join(text.split()).replace("|", "\\|")
+
+    lines = [
+        "| Criterion | " + " | ".join(cell(level) for level in data["levels"]) + " |",
+        "|---|" + "---|" * len(data["levels"]),
+    ]
+    for c in data["criteria"]:
+        lines.append(f"| **{cell(c['name'])}** | "
+                     + " | ".join(cell(d["description"]) for d in c["descriptors"]) + " |")
+    return "\n".join(lines)
@@ -0,0 +1,204 @@
+"""Per-call tracing for LLM requests: latency, tokens, cost, cache status.
+
+Every call site wraps its request in ``trace(page, model, ...)``. Records are
+aggregated in-process into counters and latency histograms, optionally appended
+to a JSONL file (``LLM_TRACE_JSONL``) and served in Prometheus text format on
+``LLM_METRICS_PORT``.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# USD per 1M tokens (input, cached input, output)
+PRICES = {
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+}
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, float("inf"))
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens=0):
+    input_price, cached_price, output_price = PRICES.get(model, (0.0, 0.0, 0.0))
+    uncached = prompt_tokens - cached_tokens
+    return (uncached * input_price + cached_tokens * cached_price + completion_tokens * output_price) / 1_000_000
+
+
+class Span:
+    """Mutable record of one call; filled in by the call site inside ``trace``"""
+
+    __slots__ = ("page", "model", "stakeholder", "route", "cache_hit", "stream", "start", "first_token_at",
+                 "prompt_tokens", "completion_tokens", "cached_tokens", "status")
+
+    def __init__(self, page, model, stakeholder=None, stream=False, route=None):
+        self.page = page
+        self.model = model
+        self.stakeholder = stakeholder
+        self.route = route
+        self.cache_hit = False
+        self.stream = stream
+        self.start = time.perf_counter()
+        self.first_token_at = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.status = "ok"
+
+    def record_usage(self, usage):
+        """Add token counts from a response (or final stream chunk) ``usage`` object.
+
+        Counts accumulate, so a span that covers a call and its repair turn bills both.
+        """
+        if usage is not None:
+            self.prompt_tokens += usage.prompt_tokens or 0
+            self.completion_tokens += usage.completion_tokens or 0
+            # Prompt tokens served from the provider's prefix cache
+            details = getattr(usage, "prompt_tokens_details", None)
+            self.cached_tokens += getattr(details, "cached_tokens", None) or 0
+
+    def first_token(self):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+
+
+class Tracer:
+    def __init__(self, jsonl_path=None, max_records=10000):
+        self.jsonl_path = jsonl_path
+        self.max_records = max_records
+        self.records = []
+        self._lock = threading.Lock()
+        # Keyed by (model, page, route, ...); route is "" for calls that are not routed
+        self._requests = defaultdict(int)  # (model, page, route, status, cache) -> count
+        self._tokens = defaultdict(int)  # (model, page, route, kind) -> tokens
+        self._cost = defaultdict(float)  # (model, page, route) -> USD
+        self._histograms = {}  # (model, page, route) -> [bucket counts, sum, count]
+        self._server = None
+
+    @contextmanager
+    def span(self, page, model, stakeholder=None, stream=False, route=None):
+        span = Span(page, model, stakeholder, stream, route)
+        try:
+            yield span
+        except Exception as e:
+            span.status = type(e).__name__
+            raise
+        finally:
+            self.finish(span)
+
+    def finish(self, span):
+        now = time.perf_counter()
+        record = {
+            "ts": time.time(),
+            "page": span.page,
+            "model": span.model,
+            "stakeholder": span.stakeholder,
+            "route": span.route,
+            "stream": span.stream,
+            "cache_hit": span.cache_hit,
+            "status": span.status,
+            "latency_s": now - span.start,
+            "ttft_s": span.first_token_at - span.start if span.first_token_at else None,
+            "prompt_tokens": span.prompt_tokens,
+            "completion_tokens": span.completion_tokens,
+            "cached_tokens": span.cached_tokens,
+            "cost_usd": 0.0 if span.cache_hit else estimate_cost(span.model, span.prompt_tokens, span.completion_tokens,
+                                                                 span.cached_tokens),
+        }
+        key = (span.model, span.page, span.route or "")
+        with self._lock:
+            self.records.append(record)
+            if len(self.records) > self.max_records:
+                del self.records[: len(self.records) - self.max_records]
+            self._requests[key + (span.status, "hit" if span.cache_hit else "miss")] += 1
+            self._tokens[key + ("prompt",)] += span.prompt_tokens
+            self._tokens[key + ("completion",)] += span.completion_tokens
+            self._tokens[key + ("cached",)] += span.cached_tokens
+            self._cost[key] += record["cost_usd"]
+            buckets, total, count = self._histograms.get(key, ([0] * len(LATENCY_BUCKETS), 0.0, 0))
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if record["latency_s"] <= bound:
+                    buckets[i] += 1
+            self._histograms[key] = (buckets, total + record["latency_s"], count + 1)
+            if self.jsonl_path:
+                with open(self.jsonl_path, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+        return record
+
+    def summary(self):
+        """Totals per (page, route, model): calls, cache hits, tokens, cost and mean latency"""
+        with self._lock:
+            records = list(self.records)
+        rows = defaultdict(lambda: {"calls": 0, "cache_hits": 0, "errors": 0, "prompt_tokens": 0,
+                                    "completion_tokens": 0, "cached_tokens": 0, "cost_usd": 0.0, "latency_s": 0.0})
+        for r in records:
+            row = rows[(r["page"], r["route"], r["model"])]
+            row["calls"] += 1
+            row["cache_hits"] += r["cache_hit"]
+            row["errors"] += r["status"] != "ok"
+            row["prompt_tokens"] += r["prompt_tokens"]
+            row["completion_tokens"] += r["completion_tokens"]
+            row["cached_tokens"] += r["cached_tokens"]
+            row["cost_usd"] += r["cost_usd"]
+            row["latency_s"] += r["latency_s"]
+        for row in rows.values():
+            row["mean_latency_s"] = row.pop("latency_s") / row["calls"]
+        return dict(rows)
+
+    def prometheus_text(self):
+        def labels(**kv):
+            return "{" + ",".join(f'{k}="{v}"' for k, v in kv.items()) + "}"
+
+        lines = ["# HELP llm_requests_total LLM calls by outcome and cache status",
+                 "# TYPE llm_requests_total counter"]
+        with self._lock:
+            for (model, page, route, status, cache), n in sorted(self._requests.items()):
+                lines.append(f"llm_requests_total{labels(model=model, page=page, route=route, status=status, cache=cache)} {n}")
+            lines += ["# HELP llm_tokens_total Prompt, completion and cached prompt tokens", "# TYPE llm_tokens_total counter"]
+            for (model, page, route, kind), n in sorted(self._tokens.items()):
+                lines.append(f"llm_tokens_total{labels(model=model, page=page, route=route, type=kind)} {n}")
+            lines += ["# HELP llm_cost_usd_total Estimated spend in USD", "# TYPE llm_cost_usd_total counter"]
+            for (model, page, route), cost in sorted(self._cost.items()):
+                lines.append(f"llm_cost_usd_total{labels(model=model, page=page, route=route)} {cost:.6f}")
+            lines += ["# HELP llm_request_duration_seconds LLM call wall time",
+                      "# TYPE llm_request_duration_seconds histogram"]
+            for (model, page, route), (buckets, total, count) in sorted(self._histograms.items()):
+                for bound, n in zip(LATENCY_BUCKETS, buckets):
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"llm_request_duration_seconds_bucket{labels(model=model, page=page, route=route, le=le)} {n}")
+                lines.append(f"llm_request_duration_seconds_sum{labels(model=model, page=page, route=route)} {total:.6f}")
+                lines.append(f"llm_request_duration_seconds_count{labels(model=model, page=page, route=route)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serve /metrics in Prometheus text format from a background thread (idempotent)"""
+        if self._server is not None:
+            return self._server
+        tracer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                body = tracer.prometheus_text().encode()
+                self.send_response(200 if self.path.startswith("/metrics") else 404)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+
+# One tracer per process; this module is imported once, so it survives Streamlit reruns
+TRACER = Tracer(jsonl_path=os.environ.get("LLM_TRACE_JSONL"))
+if os.environ.get("LLM_METRICS_PORT"):
+    TRACER.serve(int(os.environ["LLM_METRICS_PORT"]))
+
+trace = TRACER.span
@@ -0,0 +1,17 @@
+"""SMU Cox AI Portal: one Streamlit entry point for the teaching tools.
+
+``portal.navigation.run`` builds the navigation from ``PAGES``. Each tool lives
+in its own module with a ``render()`` function, imported the first time its page
+is opened, so a cold start pays only for the page being viewed (Home needs
+neither openai, numpy nor jsonschema) and a rerun only executes that page's
+``render()``. The Wind Farm interviews page is the Department_Bot script, which
+still runs on its own too.
+"""
+# (title, module with render() or a script path relative to the repo root, url path); the first is the default
+PAGES = [
+    ("Home", "portal.home", "home"),
+    ("Question Generator", "portal.questions", "questions"),
+    ("Rubric Generator", "portal.rubrics", "rubrics"),
+    ("Library", "portal.library", "library"),
+    ("Wind Farm Interviews", "Department_Bot/app.py", "wind-farm"),
+]
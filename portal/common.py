@@ -0,0 +1,97 @@
+"""Styles, page furniture and the content library shared by every portal page."""
+import os
+
+import streamlit as st
+
+from coxai.library import ContentLibrary
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# --------------------------------------------------
+# CONTENT LIBRARY
+# --------------------------------------------------
+# Every generated question set and rubric is kept here, searchable and reused for matching requests
+CONTENT_LIBRARY_DB = os.environ.get("CONTENT_LIBRARY_DB", os.path.join(ROOT, "content_library.db"))
+
+
+@st.cache_resource
+def get_content_library():
+    return ContentLibrary(CONTENT_LIBRARY_DB)
+
+
+content_library = get_content_library()
+
+# --------------------------------------------------
+# COLORS (SMU STYLE)
+# --------------------------------------------------
+SMU_BLUE = "#354CA1"
+SMU_RED = "#CC0035"
+
+# --------------------------------------------------
+# GLOBAL STYLES
+# --------------------------------------------------
+STYLES = f"""
+    <style>
+        body {{
+            background-color: white;
+        }}
+        .main-title {{
+            font-size: 44px;
+            font-weight: 700;
+            color: {SMU_BLUE};
+            margin-bottom: 0.3em;
+        }}
+        .subtitle {{
+            font-size: 20px;
+            color: #444444;
+            margin-bottom: 2em;
+            max-width: 900px;
+        }}
+        .section-title {{
+            font-size: 28px;
+            font-weight: 600;
+            color: {SMU_BLUE};
+            margin-top: 1.8em;
+        }}
+        .info-box {{
+            background-color: #F8F9FB;
+            border-left: 6px solid {SMU_RED};
+            padding: 1.5em;
+            margin-top: 1.5em;
+            max-width: 900px;
+        }}
+        .feature-title {{
+            font-size: 20px;
+            font-weight: 600;
+            color: {SMU_BLUE};
+            margin-bottom: 0.3em;
+        }}
+        .feature-text {{
+            font-size: 16px;
+            color: #333333;
+            margin-bottom: 1.5em;
+        }}
+        .footer {{
+            margin-top: 5em;
+            font-size: 14px;
+            color: #777777;
+        }}
+    </style>
+    """
+
+
+def apply_styles():
+    st.markdown(STYLES, unsafe_allow_html=True)
+
+
+def page_header(title, subtitle):
+    st.markdown(f'<div class="main-title">{title}</div>', unsafe_allow_html=True)
+
+    st.markdown(f'<div class="subtitle">{subtitle}</div>', unsafe_allow_html=True)
+
+
+def footer():
+    st.markdown(
+        '<div class="footer">© SMU Cox School of Business · Internal AI Tools Prototype</div>',
+        unsafe_allow_html=True
+    )
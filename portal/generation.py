@@ -0,0 +1,44 @@
+"""OpenAI client and structured-output plumbing shared by the Question and Rubric Generators."""
+from datetime import datetime
+
+import streamlit as st
+
+from coxai.llm import get_client
+from coxai.resilience import ResilientCaller
+
+# --------------------------------------------------
+# API KEY (TEMP DEMO KEY — REPLACE LATER)
+# --------------------------------------------------
+OPENAI_API_KEY = ""
+# Shared, pooled client: created once per process rather than on every rerun
+client = get_client(OPENAI_API_KEY)
+
+
+@st.cache_resource
+def get_llm_caller():
+    # Retries 429/5xx/timeouts with backoff; one circuit breaker shared by all sessions
+    return ResilientCaller()
+
+
+llm_caller = get_llm_caller()
+
+
+# Both generators return a LibraryItem whose data is validated JSON (see coxai.structured);
+# with reuse=True a matching item already in the library is returned without an API call
+def structured_completion(span, temperature):
+    def complete(messages, response_format):
+        response = llm_caller.call(
+            client.chat.completions.create,
+            model="gpt-4o-mini",
+            messages=messages,
+            temperature=temperature,
+            response_format=response_format
+        )
+        span.record_usage(response.usage)
+        return response.choices[0].message.content
+    return complete
+
+
+def reused_note(item):
+    st.info(f"Reused from the library (generated {datetime.fromtimestamp(item.created):%b %d, %Y}). "
+            "Untick \"Reuse from the library\" for a fresh set.")
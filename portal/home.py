@@ -0,0 +1,37 @@
+import streamlit as st
+
+from portal.common import page_header
+
+
+# --------------------------------------------------
+# HOME PAGE
+# --------------------------------------------------
+def render():
+    page_header(
+        "SMU Cox AI Teaching Tools",
+        "This platform provides AI-powered tools designed to support faculty in course design, "
+        "assessment development, and instructional planning. The tools are intended to enhance "
+        "teaching workflows while maintaining academic rigor and institutional standards."
+    )
+
+    st.markdown(
+        '<div class="info-box">'
+        '<div class="feature-title">Purpose</div>'
+        '<div class="feature-text">'
+        'These tools assist instructors in generating high-quality academic materials efficiently, '
+        'allowing more time for meaningful engagement with students.'
+        '</div>'
+
+        '<div class="feature-title">Responsible Use</div>'
+        '<div class="feature-text">'
+        'AI-generated outputs are intended as starting points and should be reviewed and refined '
+        'by faculty to ensure alignment with course objectives and academic standards.'
+        '</div>'
+
+        '<div class="feature-title">Available Tools</div>'
+        '<div class="feature-text">'
+        'Use the navigation menu on the left to access individual tools.'
+        '</div>'
+        '</div>',
+        unsafe_allow_html=True
+    )
@@ -0,0 +1,41 @@
+import json
+import time
+from datetime import datetime
+
+import streamlit as st
+
+from coxai.structured import render_question_set, render_rubric
+from portal.common import content_library, page_header
+
+LIBRARY_PAGE_SIZE = 25
+
+
+# --------------------------------------------------
+# LIBRARY
+# --------------------------------------------------
+def render():
+    page_header(
+        "Library",
+        "Search every question set and rubric generated with these tools by topic, question text or criterion."
+    )
+
+    col1, col2 = st.columns([3, 1])
+    query = col1.text_input("Search", placeholder="e.g., hedging, Use of Evidence, supply chain")
+    kind = col2.selectbox("Show", ["Everything", "Question sets", "Rubrics"])
+
+    start = time.perf_counter()
+    items = content_library.search(
+        query, kind={"Question sets": "questions", "Rubrics": "rubric"}.get(kind), limit=LIBRARY_PAGE_SIZE
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    st.caption(f"{len(items)} shown of {content_library.count()} in the library · {elapsed_ms:.1f} ms")
+
+    for item in items:
+        with st.expander(f"{item.title} · {datetime.fromtimestamp(item.created):%b %d, %Y}"):
+            if item.snippet:
+                st.caption(item.snippet)
+            st.markdown(render_question_set(item.data) if item.kind == "questions" else render_rubric(item.data))
+            st.download_button(
+                "Download JSON", json.dumps(item.data, indent=2), f"{item.kind}-{item.id}.json",
+                mime="application/json", on_click="ignore", key=f"library_json_{item.id}"
+            )
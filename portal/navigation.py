@@ -0,0 +1,49 @@
+"""Builds the portal's navigation and sidebar from ``portal.PAGES`` and runs the selected page."""
+import importlib
+import os
+
+import streamlit as st
+
+from portal import PAGES
+from portal.common import ROOT, apply_styles, content_library, footer
+
+
+def lazy_page(title, target, url_path, default=False):
+    if target.endswith(".py"):
+        return st.Page(os.path.join(ROOT, target), title=title, url_path=url_path, default=default)
+
+    def render():
+        importlib.import_module(target).render()
+    return st.Page(render, title=title, url_path=url_path, default=default)
+
+
+def run(page_title):
+    st.set_page_config(page_title=page_title, layout="wide")
+    pages = [lazy_page(*entry, default=i == 0) for i, entry in enumerate(PAGES)]
+    page = st.navigation(pages, position="hidden")
+    apply_styles()
+
+    # --------------------------------------------------
+    # SIDEBAR NAVIGATION
+    # --------------------------------------------------
+    with st.sidebar:
+        st.markdown("### SMU Cox AI Portal")
+        st.markdown("---")
+        for p in pages:
+            st.page_link(p)
+        st.markdown("---")
+        st.caption("SMU Cox School of Business")
+        cache_stats = st.empty()
+
+    page.run()
+
+    # --------------------------------------------------
+    # LIBRARY STATS (filled last so this run's lookups are counted)
+    # --------------------------------------------------
+    stats = content_library.stats()
+    cache_stats.caption(
+        f"Library reuse: {stats['hits']} hits · {stats['misses']} misses "
+        f"({stats['hit_rate']:.0%} hit rate)"
+    )
+
+    footer()
@@ -0,0 +1,192 @@
+import json
+
+import streamlit as st
+
+from coxai.batch import (BatchError, CSV_TEMPLATE, export_csv, export_json, export_markdown, parse_batch_csv,
+                         run_batch)
+from coxai.dedup import QuestionIndex, find_duplicates
+from coxai.resilience import LLMUnavailable
+from coxai.structured import generate_structured, question_set_errors, question_set_schema, render_question_set
+from coxai.tracing import trace
+from portal.common import content_library, page_header
+from portal.generation import reused_note, structured_completion
+
+DEDUP_SCOPES = ["This session", "Whole library", "Off"]
+
+
+@st.cache_resource
+def get_library_index():
+    # Embeddings of every stored question, filled from the library on first use
+    return QuestionIndex()
+
+
+library_index = get_library_index()
+
+
+# --------------------------------------------------
+# GENERATOR
+# --------------------------------------------------
+def generate_questions(topic, level, q_type, num_questions, reuse=True):
+    prompt = f"""
+    Create {num_questions} {q_type} questions for a {level} level course.
+    Topic: {topic}
+
+    If multiple choice, give 4 options without letter prefixes and the letter of the correct one.
+    Otherwise, give a model answer. Explain each answer in one or two sentences.
+    """
+
+    inputs = {"topic": topic, "level": level, "q_type": q_type, "num_questions": num_questions}
+    with trace("questions", "gpt-4o-mini") as span:
+        item = content_library.find("questions", inputs) if reuse else None
+        span.cache_hit = item is not None
+        if item is None:
+            question_set = generate_structured(
+                structured_completion(span, 0.7), prompt, "question_set",
+                question_set_schema(q_type, num_questions), question_set_errors
+            )
+            item = content_library.add("questions", inputs, question_set)
+    return item
+
+
+def drop_duplicates(item, scope):
+    """Remove questions that repeat ones shown this session (or, for "Whole library", stored earlier).
+
+    Returns the remaining question set and (stem, Match) pairs for what was removed.
+    A set reused from the library is returned as stored.
+    """
+    questions = item.data["questions"]
+    seen = st.session_state.setdefault("seen_questions", QuestionIndex(capacity=256))
+    duplicates = {}
+    if scope != "Off" and not item.reused:
+        indexes = [(seen, None)]
+        if scope == "Whole library":
+            library_index.sync(content_library)
+            indexes.append((library_index, item.id))
+        duplicates = find_duplicates([q["stem"] for q in questions], indexes)
+    kept = [q for i, q in enumerate(questions) if i not in duplicates]
+    seen.add([q["stem"] for q in kept], source=item.title)
+    return {"questions": kept}, [(questions[i]["stem"], match) for i, match in sorted(duplicates.items())]
+
+
+def duplicates_note(removed):
+    with st.expander(f"Removed {len(removed)} near-duplicate question(s)"):
+        for stem, match in removed:
+            st.markdown(f"- {stem}  \n  {match.score:.0%} similar to *{match.stem}* ({match.source})")
+
+
+# --------------------------------------------------
+# QUESTION GENERATOR
+# --------------------------------------------------
+def render():
+    page_header(
+        "Question Generator",
+        "Generate academic questions aligned with course topics, learning depth, and assessment format."
+    )
+
+    mode = st.radio("Mode", ["Single set", "Question bank (CSV batch)"], horizontal=True)
+    dedup_scope = st.radio(
+        "Remove near-duplicates of questions from", DEDUP_SCOPES, horizontal=True,
+        help="Compares the wording of each new question with earlier ones; sets reused from the library are kept as stored"
+    )
+
+    if mode == "Single set":
+        single_set(dedup_scope)
+    else:
+        question_bank(dedup_scope)
+
+
+def single_set(dedup_scope):
+    topic = st.text_input("Course topic", placeholder="e.g., Financial Risk Management")
+    level = st.selectbox("Difficulty level", ["Introductory", "Intermediate", "Advanced"])
+    q_type = st.selectbox("Question type", ["Multiple Choice", "Short Answer", "Essay"])
+    num_questions = st.slider("Number of questions", 1, 10, 5)
+    reuse = st.checkbox("Reuse from the library", value=True, help="Serve a matching earlier set instead of generating")
+
+    if st.button("Generate Questions"):
+        with st.spinner("Generating questions..."):
+            try:
+                item = generate_questions(topic, level, q_type, num_questions, reuse)
+            except LLMUnavailable:
+                st.error("The AI service is busy right now. Please try again in a minute.")
+            except Exception as e:
+                st.error(f"Could not generate questions: {e}")
+            else:
+                st.markdown("### Generated Questions")
+                if item.reused:
+                    reused_note(item)
+                question_set, removed = drop_duplicates(item, dedup_scope)
+                if removed:
+                    duplicates_note(removed)
+                st.markdown(render_question_set(question_set))
+                st.download_button(
+                    "Download JSON", json.dumps(question_set, indent=2), "questions.json",
+                    mime="application/json", on_click="ignore"
+                )
+
+
+def question_bank(dedup_scope):
+    st.markdown(
+        "Upload a CSV with a **topic** column and optional **level**, **type** and **count** columns. "
+        "Separate several levels or types with `;`, or leave the cell blank to include all of them."
+    )
+    st.download_button(
+        "Download CSV template", CSV_TEMPLATE, "question_bank_template.csv",
+        mime="text/csv", on_click="ignore"
+    )
+    uploaded = st.file_uploader("Question bank CSV", type="csv")
+    col1, col2 = st.columns(2)
+    workers = col1.slider("Parallel requests", 1, 16, 8)
+    per_minute = col2.number_input("Rate limit (requests per minute)", 10, 3000, 120, step=10)
+    reuse = st.checkbox("Reuse matching sets from the library", value=True)
+
+    jobs = None
+    if uploaded is not None:
+        try:
+            jobs = parse_batch_csv(uploaded.getvalue().decode("utf-8-sig"))
+        except (BatchError, UnicodeDecodeError) as e:
+            st.error(f"Could not read the CSV: {e}")
+        else:
+            st.caption(f"{len(jobs)} question sets, {sum(j.num_questions for j in jobs)} questions in total")
+
+    ran = False
+    if jobs and st.button("Generate Question Bank"):
+        progress = st.progress(0.0, text="Starting...")
+        table = st.empty()
+        table.dataframe([job.row() for job in jobs], hide_index=True)
+        # Sets finish out of order; redraw the table as each one comes back. Each job's
+        # LibraryItem is swapped for its de-duplicated question set here, in completion order
+        def generate(topic, level, q_type, num_questions):
+            return generate_questions(topic, level, q_type, num_questions, reuse)
+
+        for done, job in enumerate(run_batch(jobs, generate, workers, per_minute), start=1):
+            if job.status == "done":
+                job.content, removed = drop_duplicates(job.content, dedup_scope)
+                job.duplicates = len(removed)
+            progress.progress(done / len(jobs), text=f"{done} of {len(jobs)} question sets finished")
+            table.dataframe([j.row() for j in jobs], hide_index=True)
+        st.session_state.question_bank = jobs
+        ran = True
+
+    bank = st.session_state.get("question_bank")
+    if bank:
+        if not ran:
+            st.dataframe([job.row() for job in bank], hide_index=True)
+        failed = sum(job.status == "failed" for job in bank)
+        if failed:
+            st.warning(f"{failed} of {len(bank)} question sets failed; they are marked in the export.")
+        duplicates = sum(job.duplicates for job in bank)
+        if duplicates:
+            st.caption(f"{duplicates} near-duplicate questions were removed from the bank.")
+        col1, col2, col3 = st.columns(3)
+        col1.download_button(
+            "Download question bank (Markdown)", lambda: export_markdown(bank), "question_bank.md",
+            mime="text/markdown", on_click="ignore"
+        )
+        col2.download_button(
+            "Download question bank (CSV)", lambda: export_csv(bank), "question_bank.csv",
+            mime="text/csv", on_click="ignore"
+        )
+        col3.download_button(
+            "Download question bank (JSON)", lambda: export_json(bank), "question_bank.json",
+            mime="application/json", on_click="ignore"
+        )
@@ -0,0 +1,78 @@
+import json
+
+import streamlit as st
+
+from coxai.resilience import LLMUnavailable
+from coxai.structured import generate_structured, render_rubric, rubric_errors, rubric_schema
+from coxai.tracing import trace
+from portal.common import content_library, page_header
+from portal.generation import reused_note, structured_completion
+
+
+# --------------------------------------------------
+# GENERATOR
+# --------------------------------------------------
+def generate_rubric(assignment, criteria, scale, reuse=True):
+    prompt = f"""
+    Create a grading rubric for the assignment titled "{assignment}".
+
+    Evaluation criteria:
+    {criteria}
+
+    Use this grading scale:
+    {scale}
+
+    Describe the expected performance for every criterion at every level of the scale.
+    """
+
+    inputs = {"assignment": assignment, "criteria": criteria, "scale": scale}
+    with trace("rubric", "gpt-4o-mini") as span:
+        item = content_library.find("rubric", inputs) if reuse else None
+        span.cache_hit = item is not None
+        if item is None:
+            rubric = generate_structured(
+                structured_completion(span, 0.6), prompt, "rubric",
+                rubric_schema(criteria, scale), rubric_errors
+            )
+            item = content_library.add("rubric", inputs, rubric)
+    return item
+
+
+# --------------------------------------------------
+# RUBRIC GENERATOR
+# --------------------------------------------------
+def render():
+    page_header(
+        "Rubric Generator",
+        "Create structured grading rubrics that clearly define performance expectations and evaluation criteria."
+    )
+
+    assignment = st.text_input("Assignment name", placeholder="e.g., Strategy Case Analysis")
+    criteria = st.text_area(
+        "Evaluation criteria (comma-separated)",
+        placeholder="Clarity, Depth of Analysis, Organization, Use of Evidence"
+    )
+    scale = st.selectbox(
+        "Grading scale",
+        ["Excellent / Good / Fair / Poor", "4-point scale", "Percentage-based"]
+    )
+
+    reuse = st.checkbox("Reuse from the library", value=True, help="Serve a matching earlier rubric instead of generating")
+
+    if st.button("Generate Rubric"):
+        with st.spinner("Generating rubric..."):
+            try:
+                item = generate_rubric(assignment, criteria, scale, reuse)
+            except LLMUnavailable:
+                st.error("The AI service is busy right now. Please try again in a minute.")
+            except Exception as e:
+                st.error(f"Could not generate rubric: {e}")
+            else:
+                st.markdown("### Generated Rubric")
+                if item.reused:
+                    reused_note(item)
+                st.markdown(render_rubric(item.data))
+                st.download_button(
+                    "Download JSON", json.dumps(item.data, indent=2), "rubric.json",
+                    mime="application/json", on_click="ignore"
+                )
@@ -0,0 +1,52 @@
+import pytest
+
+from coxai.answers import lookup_answer
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("What's the PERT estimate for A8?", "13.33 days"),
+    ("What is A8's duration?", "most likely 13"),
+    ("How much does A4 cost?", "baseline cost $560k"),
+    ("How much does S3 cost?", "**S3**"),
+    ("What are the predecessors of A6?", "predecessors A4, A5"),
+    ("What's the variance of A8?", "variance"),
+    ("What's the deadline?", "June 30"),
+    ("How much contingency do we have?", "Contingency available"),
+    ("What's the cost of being three days late?", "3 days late"),
+    ("What's the cost of being 2 weeks late?", "14 days late costs 14 × $3,000 = $42,000"),
+    ("What does a week of delay cost us?", "7 days late"),
+    ("What's the PERT estimate for a8?", "**A8"),
+    ("How much does A-4 cost?", "baseline cost $560k"),
+    ("How much does a 3 day delay cost?", "3 days late costs"),
+    ("What is the cost of a 3 day delay?", "3 days late costs"),
+    ("how much is a 2 week delay?", "14 days late costs"),
+])
+def test_data_lookups_are_answered_locally(message, expected):
+    answer = lookup_answer(message)
+    assert answer is not None and expected in answer
+
+
+@pytest.mark.parametrize("message", [
+    "How much does a 3 day delay cost?",
+    "What is the cost of a 3 day delay?",
+    "how much is a 2 week delay?",
+])
+def test_article_before_a_number_is_not_an_activity_code(message):
+    answer = lookup_answer(message)
+    assert "A3" not in answer and "A2" not in answer and "baseline cost" not in answer
+
+
+@pytest.mark.parametrize("message", [
+    "What's the deadline for the regulatory paperwork?",
+    "What happens if A3 runs 3 days late?",
+    "How much contingency is left after S3?",
+    "What is the status of A6 right now?",
+    "What do you need from me before A6 starts?",
+    "Is A6 running late?",
+    "When does A1 start?",
+    "Why is A8 so expensive?",
+    "Should we crash A6?",
+    "Thanks, that helps.",
+])
+def test_other_questions_go_to_the_stakeholder(message):
+    assert lookup_answer(message) is None
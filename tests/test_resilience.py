@@ -0,0 +1,102 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from coxai.resilience import CircuitBreaker, CircuitOpen, LLMUnavailable, ResilientCaller
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def transient():
+    return openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+
+
+class Flaky:
+    """Raises the queued errors in turn, then returns "ok" """
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def caller(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0, clock=clock)
+    return ResilientCaller(max_attempts=3, base_delay=0.0, breaker=breaker)
+
+
+def trip(caller):
+    with pytest.raises(LLMUnavailable):
+        caller.call(Flaky(transient(), transient(), transient()))
+    assert caller.breaker.state == "open"
+
+
+def test_open_breaker_fails_fast(caller):
+    trip(caller)
+    fn = Flaky()
+    with pytest.raises(CircuitOpen):
+        caller.call(fn)
+    assert fn.calls == 0
+
+
+def test_probe_recovers_after_a_transient_error(caller, clock):
+    trip(caller)
+    clock.now += 31
+    assert caller.breaker.state == "half-open"
+    # The probe's first attempt fails transiently; its retry must not be refused by the probe itself
+    assert caller.call(Flaky(transient())) == "ok"
+    assert caller.breaker.state == "closed"
+    assert caller.call(Flaky()) == "ok"
+
+
+def test_failed_probe_reopens_then_recovers(caller, clock):
+    trip(caller)
+    clock.now += 31
+    with pytest.raises(LLMUnavailable):
+        caller.call(Flaky(transient(), transient(), transient()))
+    assert caller.breaker.state == "open"
+    with pytest.raises(CircuitOpen):
+        caller.call(Flaky())
+    clock.now += 31
+    assert caller.call(Flaky()) == "ok"
+    assert caller.breaker.state == "closed"
+
+
+def test_interrupted_probe_lets_the_next_call_probe(caller, clock):
+    trip(caller)
+    clock.now += 31
+    with pytest.raises(KeyboardInterrupt):
+        caller.call(Flaky(KeyboardInterrupt()))
+    assert caller.call(Flaky()) == "ok"
+
+
+def test_async_probe_recovers_after_a_transient_error(caller, clock):
+    trip(caller)
+    clock.now += 31
+
+    fn = Flaky(transient())
+
+    async def flaky(**kwargs):
+        return fn(**kwargs)
+
+    assert asyncio.run(caller.acall(flaky)) == "ok"
+    assert caller.breaker.state == "closed"
@@ -0,0 +1,57 @@
+import pytest
+
+from coxai.router import ANALYSIS, SIMPLE, ModelRouter
+
+ROUTER = ModelRouter()
+
+
+@pytest.mark.parametrize("message", [
+    "Hi Sam, thanks for making time.",
+    "How much does S3 cost?",
+    "What is A8's duration?",
+    "Who handles A5?",
+    "When does A1 start?",
+    "What's your three-point estimate for A3?",
+    "Is A6 running late?",
+    "What does the schedule look like this week?",
+    "How much contingency do we have?",
+    "What's the deadline?",
+])
+def test_simple_messages_use_the_fast_model(message):
+    assert ROUTER.classify(message)[0] == SIMPLE
+
+
+@pytest.mark.parametrize("message", [
+    "What's the critical path through A1 to A12?",
+    "Compare S2 and S4 on cost and days saved.",
+    "What if A6 slips 10 days, does anything change?",
+    "What's the probability we finish before the deadline?",
+    "Which option do you recommend?",
+    "Can you calculate the PERT duration for A8?",
+    "How much slack does A4 have?",
+    "Run a Monte Carlo on the finish date with the A6-A8 rework loop.",
+    "Should we crash S3 or S4?",
+    "Is S3 worth it given the rework risk?",
+    "What happens to the deadline if A8 slips by 4 days?",
+    "S2 or S5, given the coupling risk?",
+    "What happens if the paperwork is late?",
+])
+def test_analysis_messages_use_the_premium_model(message):
+    assert ROUTER.classify(message)[0] == ANALYSIS
+
+
+@pytest.mark.parametrize("message, previous, expected", [
+    ("Why?", "What's the critical path through A1 to A12?", ANALYSIS),
+    ("Can you elaborate?", "Which option do you recommend?", ANALYSIS),
+    ("Why?", "Who handles A5?", SIMPLE),
+    ("So what is the plan", "What's the probability we finish before the deadline?", SIMPLE),
+    ("And who signs off on that?", "Compare S2 and S4 on cost.", SIMPLE),
+])
+def test_follow_ups(message, previous, expected):
+    assert ROUTER.classify(message, previous)[0] == expected
+
+
+def test_routes_name_the_configured_model():
+    router = ModelRouter(models={SIMPLE: "small", ANALYSIS: "large"})
+    assert router.route("Who handles A5?").model == "small"
+    assert router.route("What's the critical path?").model == "large"